@@ -22,10 +22,16 @@ from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
+from app.commons.policy_cache import policy_versions
+from app.commons.policy_cache.broadcast import PolicyBroadcaster
+from app.commons.policy_cache.listener import PolicyChangeListener
+from app.components.keycloak.dependencies import get_keycloak_client
 from app.config import Settings
 from app.config import get_settings
 from app.resources.error_handler import APIException
 from app.routers.api_registry import api_registry
+from app.routers.permissions.dependencies import get_casbin_adapter
+from app.routers.permissions.dependencies import get_permission_catalogue_cache
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
@@ -66,6 +72,8 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         )
 
     setup_logging(settings)
+    setup_policy_cache(app, settings)
+    setup_clients(app)
     api_registry(app)
     instrument_app(app)
 
@@ -78,6 +86,29 @@ def setup_logging(settings: Settings) -> None:
     configure_logging(settings.LOGGING_LEVEL, settings.LOGGING_FORMAT)
 
 
+def setup_policy_cache(app: FastAPI, settings: Settings) -> None:
+    """Configure policy and permission metadata loading and cross-worker invalidation of cached policies."""
+
+    app.add_event_handler('startup', get_permission_catalogue_cache.preload)
+    app.add_event_handler('shutdown', get_casbin_adapter.close)
+
+    if settings.CASBIN_POLICY_BROADCAST_ENABLED:
+        broadcaster = PolicyBroadcaster(settings.REDIS_URL, settings.CASBIN_POLICY_BROADCAST_CHANNEL, policy_versions)
+        app.add_event_handler('startup', broadcaster.start)
+        app.add_event_handler('shutdown', broadcaster.stop)
+
+    if settings.CASBIN_POLICY_LISTEN_ENABLED:
+        listener = PolicyChangeListener(settings.RDS_DB_URI, policy_versions)
+        app.add_event_handler('startup', listener.start)
+        app.add_event_handler('shutdown', listener.stop)
+
+
+def setup_clients(app: FastAPI) -> None:
+    """Configure closing of long-lived http clients shared between requests."""
+
+    app.add_event_handler('shutdown', get_keycloak_client.close)
+
+
 def instrument_app(app) -> None:
     """Instrument the application with OpenTelemetry tracing."""
 
@@ -0,0 +1,158 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import hashlib
+import json
+import threading
+import time as tm
+from collections import Counter
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+
+from app.commons.policy_cache import PolicyVersion
+from app.commons.policy_cache import PolicyVersions
+from app.logger import logger
+
+ORDER_TYPES = ('asc', 'desc')
+
+# Key of the catalogue in policy versions, it cannot clash with project codes which are lowercase alphanumeric.
+CATALOGUE_VERSION_KEY = ':permission_metadata'
+
+
+def get_sort_key(column: str) -> Callable[[tuple[dict[str, Any], dict[str, Any]]], tuple[bool, Any]]:
+    """Get sort key of permissions by column placing null values after other values."""
+
+    def sort_key(permission: tuple[dict[str, Any], dict[str, Any]]) -> tuple[bool, Any]:
+        return permission[0][column] is None, permission[0][column]
+
+    return sort_key
+
+
+class PermissionCatalogue:
+    """Immutable catalogue of permission metadata with views presorted by every column.
+
+    Permission metadata only changes with migrations, so the catalogue is built once for a migration version. Views are
+    sorted with null values last in ascending order and first in descending order. Strings are compared by codepoint
+    rather than by the database collation, so mixed case and non-ASCII names may be ordered differently than in SQL. The
+    revision identifies the catalogue content, so it differs whenever permissions change even without a migration.
+    Permissions keep raw column values of permissions for building project matrices from the same snapshot.
+    """
+
+    def __init__(self, permissions: Iterable[tuple[dict[str, Any], dict[str, Any]]], migration_version: str | None):
+        """Build catalogue from raw column values of permissions along with their serialized form."""
+
+        self.migration_version = migration_version
+
+        permissions = list(permissions)
+        self.total = len(permissions)
+        self.permissions = tuple(columns for columns, _ in permissions)
+
+        content = json.dumps(
+            sorted(json.dumps(serialized, sort_keys=True, default=str) for _, serialized in permissions)
+        )
+        self.revision = f'{migration_version}:{hashlib.sha1(content.encode()).hexdigest()}'
+        columns = permissions[0][0].keys() if permissions else ()
+
+        self._views: dict[tuple[str, str], tuple[dict[str, Any], ...]] = {}
+        for column in columns:
+            for order_type in ORDER_TYPES:
+                ordered = sorted(
+                    permissions,
+                    key=get_sort_key(column),
+                    reverse=order_type == 'desc',
+                )
+                self._views[column, order_type] = tuple(serialized for _, serialized in ordered)
+
+    def list_permissions(self, order_by: str, order_type: str, page: int, page_size: int) -> list[dict[str, Any]]:
+        """Return copies of serialized permissions on page of the view sorted by order_by."""
+
+        if not self.total:
+            return []
+
+        try:
+            view = self._views[order_by, 'desc' if order_type == 'desc' else 'asc']
+        except KeyError:
+            raise ValueError(f'Permission metadata cannot be ordered by {order_by}')
+
+        start = page * page_size
+        return [dict(permission) for permission in view[start : start + page_size]]
+
+
+class PermissionCatalogueCache:
+    """Process wide permission catalogue refreshed when the migration version changes or a reload is requested.
+
+    Migration version is checked at most once per check interval. Explicit reloads bump the catalogue key in policy
+    versions, which is propagated to other workers over the policy invalidation channel, and every worker loads the
+    catalogue again once it sees the version change. Cache is accessed from threadpool workers.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str | None], PermissionCatalogue],
+        get_migration_version: Callable[[], str | None],
+        check_interval: int,
+        versions: PolicyVersions,
+    ) -> None:
+        self.load = load
+        self.get_migration_version = get_migration_version
+        self.check_interval = check_interval
+        self.versions = versions
+
+        self.stats = Counter()
+        self._catalogue: PermissionCatalogue | None = None
+        self._version: PolicyVersion | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, version: PolicyVersion) -> bool:
+        return (
+            self._catalogue is not None
+            and self._version == version
+            and tm.monotonic() < self._checked_at + self.check_interval
+        )
+
+    def get(self) -> PermissionCatalogue:
+        """Return catalogue loading it when it is missing, reload was requested or the migration version changed."""
+
+        version = self.versions.get(CATALOGUE_VERSION_KEY)
+        catalogue = self._catalogue
+        if self._is_fresh(version):
+            self.stats['hits'] += 1
+            return catalogue
+
+        with self._lock:
+            catalogue = self._catalogue
+            if self._is_fresh(version):
+                self.stats['hits'] += 1
+                return catalogue
+
+            migration_version = self.get_migration_version()
+            if catalogue is None or self._version != version or catalogue.migration_version != migration_version:
+                catalogue = self._load(migration_version, version)
+            self._checked_at = tm.monotonic()
+            self.stats['checks'] += 1
+
+        return catalogue
+
+    def reload(self) -> PermissionCatalogue:
+        """Load catalogue regardless of the migration version and make other workers load it as well."""
+
+        version = self.versions.bump(CATALOGUE_VERSION_KEY)
+
+        with self._lock:
+            catalogue = self._load(self.get_migration_version(), version)
+            self._checked_at = tm.monotonic()
+
+        return catalogue
+
+    def _load(self, migration_version: str | None, version: PolicyVersion) -> PermissionCatalogue:
+        catalogue = self.load(migration_version)
+        self._catalogue = catalogue
+        self._version = version
+        self.stats['loads'] += 1
+        logger.info(f'Loaded {catalogue.total} permissions metadata for migration version {migration_version}')
+        return catalogue
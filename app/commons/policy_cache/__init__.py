@@ -0,0 +1,97 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import threading
+from collections.abc import Callable
+
+from app.logger import logger
+
+PolicyVersion = tuple[int, int]
+
+
+class PolicyVersions:
+    """Per-project policy versions used to invalidate cached policies.
+
+    Every committed change of project casbin rules bumps the project version. Caches store the version they were
+    built with and treat entries with an outdated version as missing. The generation part of the version is bumped
+    when all projects have to be invalidated at once.
+
+    Channels delivering changes made by other workers or outside of the service report their state here. Policies are
+    considered synchronized when no channel is registered or at least one of them is connected. Otherwise caches are
+    expected to fall back to short expiration times.
+    """
+
+    def __init__(self) -> None:
+        self._channels: dict[str, bool] = {}
+        self._generation = 0
+        self._versions: dict[str, int] = {}
+        self._subscribers: list[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def synchronized(self) -> bool:
+        """Check if changes made outside of this process are delivered to it."""
+
+        return not self._channels or any(self._channels.values())
+
+    def set_channel_state(self, name: str, connected: bool) -> None:
+        """Register invalidation channel or update its connection state."""
+
+        self._channels[name] = connected
+
+    def remove_channel(self, name: str) -> None:
+        """Unregister invalidation channel."""
+
+        self._channels.pop(name, None)
+
+    def get(self, project_code: str) -> PolicyVersion:
+        """Return current policy version for project."""
+
+        return self._generation, self._versions.get(project_code, 0)
+
+    def bump(self, project_code: str, notify: bool = True) -> PolicyVersion:
+        """Increment policy version for project and optionally notify subscribers."""
+
+        with self._lock:
+            self._versions[project_code] = self._versions.get(project_code, 0) + 1
+            version = self.get(project_code)
+
+        if not notify:
+            return version
+
+        for subscriber in self._subscribers:
+            try:
+                subscriber(project_code)
+            except Exception:
+                logger.exception(f'Failed to notify policy version subscriber about {project_code} change')
+
+        return version
+
+    def bump_all(self) -> None:
+        """Invalidate policies of all projects without notifying subscribers."""
+
+        with self._lock:
+            self._generation += 1
+
+    def subscribe(self, subscriber: Callable[[str], None]) -> None:
+        """Register callable that is invoked with project code on every local version bump."""
+
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Callable[[str], None]) -> None:
+        """Remove previously registered subscriber."""
+
+        self._subscribers.remove(subscriber)
+
+
+policy_versions = PolicyVersions()
+
+
+def invalidate_project_policies(*project_codes: str) -> None:
+    """Invalidate cached policies of projects after their casbin rules have been changed."""
+
+    for project_code in set(project_codes):
+        policy_versions.bump(project_code)
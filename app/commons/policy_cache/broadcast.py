@@ -0,0 +1,120 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from app.commons.policy_cache import PolicyVersions
+from app.logger import logger
+
+
+class PolicyBroadcaster:
+    """Propagate project policy invalidations between workers over Redis pub/sub channel.
+
+    Local version bumps are published to the channel and invalidations received from other workers are applied to
+    local policy versions. The channel state is reported to policy versions, and all policies are invalidated once the
+    subscription is restored because messages may have been missed while it was down.
+    """
+
+    name = 'redis'
+
+    def __init__(self, redis_url: str, channel: str, versions: PolicyVersions, reconnect_delay: float = 1.0) -> None:
+        self.redis_url = redis_url
+        self.channel = channel
+        self.versions = versions
+        self.reconnect_delay = reconnect_delay
+
+        self.origin = uuid4().hex
+        self.redis: Redis | None = None
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[str] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def publish(self, project_code: str) -> None:
+        """Schedule invalidation message for project.
+
+        Safe to call from threadpool workers as well as from the event loop.
+        """
+
+        if self._loop is None or self._loop.is_closed():
+            return
+
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, project_code)
+
+    def receive(self, data: str | bytes) -> None:
+        """Apply invalidation message received from the channel."""
+
+        try:
+            message = json.loads(data)
+            origin, project_code = message['origin'], message['project_code']
+        except (ValueError, TypeError, KeyError):
+            logger.warning(f'Received malformed policy invalidation message: {data!r}')
+            return
+
+        if origin != self.origin:
+            self.versions.bump(project_code, notify=False)
+
+    async def _publish_messages(self) -> None:
+        while True:
+            project_code = await self._queue.get()
+            message = json.dumps({'origin': self.origin, 'project_code': project_code})
+            try:
+                await self.redis.publish(self.channel, message)
+            except Exception as e:
+                logger.error(f'Failed to publish policy invalidation for {project_code}: {e}')
+
+    async def _receive_messages(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self.versions.bump_all()
+                    self.versions.set_channel_state(self.name, True)
+                    logger.info(f'Subscribed to policy invalidation channel {self.channel}')
+
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self.receive(message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Lost policy invalidation channel {self.channel}: {e}')
+            finally:
+                self.versions.set_channel_state(self.name, False)
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        """Connect to Redis and start publishing and receiving invalidations."""
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self.redis = Redis.from_url(self.redis_url, health_check_interval=10)
+        self.versions.set_channel_state(self.name, False)
+        self.versions.subscribe(self.publish)
+
+        self._tasks = [
+            asyncio.create_task(self._publish_messages()),
+            asyncio.create_task(self._receive_messages()),
+        ]
+
+    async def stop(self) -> None:
+        """Stop background tasks and close Redis connections."""
+
+        self.versions.unsubscribe(self.publish)
+        self._loop = None
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        await self.redis.aclose()
+        self.versions.remove_channel(self.name)
@@ -0,0 +1,92 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from typing import Any
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.commons.policy_cache import PolicyVersions
+from app.logger import logger
+
+POLICY_CHANGES_CHANNEL = 'casbin_rule_changed'
+
+
+class PolicyChangeListener:
+    """Invalidate project policies on casbin_rule change notifications sent by Postgres.
+
+    The notifications are emitted by the casbin_rule and policy_inheritance table triggers with the affected project
+    code as payload, so changes made by any writer, including migrations and manual SQL, are delivered. The connection
+    is verified periodically and re-established after it is lost.
+    """
+
+    name = 'postgres'
+
+    def __init__(
+        self,
+        db_uri: str,
+        versions: PolicyVersions,
+        channel: str = POLICY_CHANGES_CHANNEL,
+        reconnect_delay: float = 1.0,
+        keepalive_interval: float = 10.0,
+    ) -> None:
+        self.dsn = make_url(db_uri).set(drivername='postgresql').render_as_string(hide_password=False)
+        self.channel = channel
+        self.versions = versions
+        self.reconnect_delay = reconnect_delay
+        self.keepalive_interval = keepalive_interval
+
+        self._task: asyncio.Task | None = None
+
+    def receive(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        """Apply casbin_rule change notification."""
+
+        self.versions.bump(payload, notify=False)
+
+    async def _listen(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                terminated = asyncio.Event()
+                connection.add_termination_listener(lambda _, event=terminated: event.set())
+                await connection.add_listener(self.channel, self.receive)
+                self.versions.bump_all()
+                self.versions.set_channel_state(self.name, True)
+                logger.info(f'Listening for casbin rule changes on {self.channel}')
+
+                while not terminated.is_set():
+                    try:
+                        await asyncio.wait_for(terminated.wait(), timeout=self.keepalive_interval)
+                    except asyncio.TimeoutError:
+                        await connection.execute('SELECT 1')
+
+                logger.error(f'Connection listening on {self.channel} has been terminated')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Lost casbin rule change notifications channel {self.channel}: {e}')
+            finally:
+                self.versions.set_channel_state(self.name, False)
+                if connection is not None:
+                    connection.terminate()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        """Start listening for casbin_rule change notifications."""
+
+        self.versions.set_channel_state(self.name, False)
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection."""
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.versions.remove_channel(self.name)
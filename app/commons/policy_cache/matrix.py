@@ -0,0 +1,122 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import hashlib
+import threading
+import time as tm
+from collections import Counter
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from app.commons.policy_cache import PolicyVersion
+from app.commons.policy_cache import PolicyVersions
+from app.models.permissions import DEFAULT_PROJECT_CODE
+
+
+class ProjectMatrix:
+    """Role by permission matrix of project together with project roles.
+
+    Permissions map permission metadata ids to allowed project roles. Roles are kept as raw column values for sorting
+    along with their serialized form. Etag identifies the content the matrix has been built from.
+    """
+
+    def __init__(
+        self, permissions: dict[str, dict[str, bool]], roles: list[tuple[dict[str, Any], dict[str, Any]]], etag: str
+    ) -> None:
+        self.permissions = permissions
+        self.roles = roles
+        self.etag = etag
+
+    def get_etag(self, *parts: str) -> str:
+        """Return etag of response built from the matrix and request parts."""
+
+        content = ':'.join([self.etag, *parts])
+        return f'"{hashlib.sha1(content.encode()).hexdigest()}"'
+
+    def list_roles(self, order_by: str, order_type: str) -> list[dict[str, Any]]:
+        """List default roles sorted by name followed by other roles sorted by order_by."""
+
+        default_roles = sorted((role for role in self.roles if role[0]['is_default']), key=lambda role: role[0]['name'])
+        other_roles = sorted(
+            (role for role in self.roles if not role[0]['is_default']),
+            key=lambda role: (role[0][order_by] is None, role[0][order_by]),
+            reverse=order_type == 'desc',
+        )
+        return [serialized for _, serialized in default_roles + other_roles]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check if etag matches any of the etags in If-None-Match header."""
+
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip().removeprefix('W/')
+        if candidate in ('*', etag):
+            return True
+
+    return False
+
+
+class ProjectMatrixCache:
+    """Bounded LRU cache of project role by permission matrices.
+
+    Matrix is rebuilt once the project policy version, the version of the default project policy it may inherit, or
+    the revision of permission metadata it has been built for changes. Entries expire after ttl seconds, or after
+    fallback ttl seconds while policy versions are not synchronized. Cache is accessed from threadpool workers.
+    """
+
+    def __init__(self, versions: PolicyVersions, size: int, ttl: int, fallback_ttl: int | None = None) -> None:
+        self.versions = versions
+        self.size = size
+        self.ttl = ttl
+        self.fallback_ttl = ttl if fallback_ttl is None else min(ttl, fallback_ttl)
+
+        self.stats = Counter()
+        self._matrices: OrderedDict[str, tuple[float, tuple[Any, ...], ProjectMatrix]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._matrices)
+
+    def _get_version(self, project_code: str) -> tuple[PolicyVersion, PolicyVersion]:
+        return self.versions.get(project_code), self.versions.get(DEFAULT_PROJECT_CODE)
+
+    def get(
+        self, project_code: str, build: Callable[[str], ProjectMatrix], revision: str | None = None
+    ) -> ProjectMatrix:
+        """Return matrix of project building it with build callable when it is missing or outdated."""
+
+        version = (*self._get_version(project_code), revision)
+        ttl = self.ttl if self.versions.synchronized else self.fallback_ttl
+
+        with self._lock:
+            entry = self._matrices.get(project_code)
+            if entry is not None and entry[1] == version and tm.monotonic() < entry[0] + ttl:
+                self._matrices.move_to_end(project_code)
+                self.stats['hits'] += 1
+                return entry[2]
+            self.stats['misses'] += 1
+
+        matrix = build(project_code)
+
+        with self._lock:
+            self._matrices[project_code] = (tm.monotonic(), version, matrix)
+            self._matrices.move_to_end(project_code)
+            self.stats['builds'] += 1
+            while len(self._matrices) > self.size:
+                self._matrices.popitem(last=False)
+                self.stats['evictions'] += 1
+
+        return matrix
+
+    def clear(self) -> None:
+        """Remove all matrices."""
+
+        with self._lock:
+            self._matrices.clear()
@@ -0,0 +1,104 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time as tm
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi_sqlalchemy import db
+
+from app.commons.psql_services.permissions import create_project_records
+from app.components.identity.crud import IdentityCRUD
+from app.config import ConfigSettings
+from app.logger import logger
+from app.models.ops_admin import ProjectOnboardingStep
+from app.services.data_providers.identity_client import get_identity_client
+
+DEFAULT_PROJECT_ROLES = ('admin', 'contributor', 'collaborator')
+
+
+class ProjectOnboardingError(Exception):
+    """Raised when some of the project onboarding steps have failed."""
+
+    def __init__(self, failed_steps: list[str]) -> None:
+        super().__init__(f'Failed project onboarding steps: {", ".join(failed_steps)}')
+        self.failed_steps = failed_steps
+
+
+class ProjectOnboardingPipeline:
+    """Onboard project to Keycloak, the database and the directory with a single call.
+
+    Steps do not depend on each other, so they run concurrently. Every step skips what has been done already, which
+    makes onboarding resumable by running it again for the steps that have failed.
+    """
+
+    def __init__(
+        self, identity_crud: IdentityCRUD, project_code: str, project_roles: list[str], description: str = ''
+    ) -> None:
+        self.identity_crud = identity_crud
+        self.project_code = project_code
+        self.project_roles = project_roles
+        self.description = description
+
+        self.steps = {
+            ProjectOnboardingStep.REALM_ROLES: self.create_realm_roles,
+            ProjectOnboardingStep.DATABASE: self.create_database_records,
+            ProjectOnboardingStep.DIRECTORY_GROUP: self.create_directory_group,
+        }
+
+    async def create_realm_roles(self) -> dict[str, Any]:
+        """Create Keycloak realm roles of the project."""
+
+        operations_admin = await self.identity_crud.create_operations_admin()
+        created = await operations_admin.create_project_realm_roles(
+            self.project_roles, self.project_code, exist_ok=True
+        )
+        return {'created': created}
+
+    async def create_database_records(self) -> dict[str, Any]:
+        """Create role records and casbin rules of the project in a single transaction."""
+
+        roles = {role: role in DEFAULT_PROJECT_ROLES for role in self.project_roles}
+
+        def create() -> dict[str, int]:
+            # Runs in its own session as the request session must not be shared with a threadpool worker while other
+            # steps may be using it.
+            with db():
+                return create_project_records(
+                    self.project_code, roles, ConfigSettings.CASBIN_DEFAULT_POLICY_INHERITANCE_ENABLED
+                )
+
+        return await run_in_threadpool(create)
+
+    async def create_directory_group(self) -> dict[str, Any]:
+        """Create directory group of the project."""
+
+        IdentityClient = get_identity_client()
+        async with IdentityClient() as client:
+            group_name = client.format_group_name(self.project_code)
+            await client.create_group(group_name, self.description, exist_ok=True)
+        return {'group_name': group_name}
+
+    async def run_step(self, step: ProjectOnboardingStep) -> dict[str, Any]:
+        """Run onboarding step and report its outcome along with the time it took."""
+
+        start = tm.perf_counter()
+        try:
+            result = {'status': 'completed', 'details': await self.steps[step]()}
+        except Exception as e:
+            logger.exception(f'Failed to run {step.value} onboarding step for project {self.project_code}')
+            result = {'status': 'failed', 'error': str(e)}
+        result['duration_ms'] = round((tm.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def run(self, steps: Iterable[ProjectOnboardingStep]) -> dict[str, dict[str, Any]]:
+        """Run onboarding steps concurrently and return their outcomes by step name."""
+
+        steps = list(dict.fromkeys(steps))
+        results = await asyncio.gather(*(self.run_step(step) for step in steps))
+        return {step.value: result for step, result in zip(steps, results)}
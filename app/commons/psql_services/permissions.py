@@ -4,28 +4,50 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
 from fastapi_sqlalchemy import db
+from sqlalchemy import literal
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
+from app.commons.permission_catalogue import PermissionCatalogue
+from app.commons.policy_cache import invalidate_project_policies
+from app.commons.policy_cache.matrix import ProjectMatrix
 from app.logger import logger
 from app.models.api_response import EAPIResponseCode
+from app.models.permissions import DEFAULT_PROJECT_CODE
 from app.models.permissions import CasbinRule
 from app.models.permissions import PermissionMetadataModel
+from app.models.permissions import PolicyInheritanceModel
 from app.models.permissions import RoleModel
-from app.models.permissions_schema import ListPermissions
 from app.models.permissions_schema import RuleModel
 from app.resources.error_handler import APIException
 
 
-def list_permissions(data: ListPermissions) -> tuple[list[PermissionMetadataModel], int]:
-    """List permissions with pagination and sorting."""
-    permissions = db.session.query(PermissionMetadataModel)
-    count = permissions.count()
-    if data.order_type == 'desc':
-        sort_param = getattr(PermissionMetadataModel, data.order_by).desc()
-    else:
-        sort_param = getattr(PermissionMetadataModel, data.order_by).asc()
-    permissions = permissions.order_by(sort_param).offset(data.page * data.page_size).limit(data.page_size).all()
-    return permissions, count
+def get_migration_version() -> str | None:
+    """Get current alembic migration version of the database."""
+    return db.session.execute(text('SELECT version_num FROM alembic_version')).scalar()
+
+
+def get_permission_catalogue(migration_version: str | None) -> PermissionCatalogue:
+    """Load all permissions metadata into catalogue."""
+    permissions = db.session.query(PermissionMetadataModel).all()
+    columns = [column.key for column in PermissionMetadataModel.__table__.columns]
+    return PermissionCatalogue(
+        [
+            ({column: getattr(permission, column) for column in columns}, permission.to_dict())
+            for permission in permissions
+        ],
+        migration_version=migration_version,
+    )
 
 
 def get_permission_metadata_by_id(metadata_id: str) -> dict:
@@ -38,11 +60,110 @@ def get_permission_metadata_by_id(metadata_id: str) -> dict:
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
 
 
+def get_policy_project_codes(project_code: str) -> list[str]:
+    """Get project codes of casbin rules that make up the project policy.
+
+    The default project code is included when the project inherits default rules.
+    """
+    if db.session.query(PolicyInheritanceModel).get(project_code) is None:
+        return [project_code]
+    return [project_code, DEFAULT_PROJECT_CODE]
+
+
+def create_policy_inheritance(project_code: str):
+    """Make project inherit casbin rules of the default project."""
+    try:
+        db.session.merge(PolicyInheritanceModel(project_code=project_code))
+        db.session.commit()
+        invalidate_project_policies(project_code)
+    except Exception as e:
+        error_msg = f'Error creating policy inheritance for {project_code} in psql: {str(e)}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
+
+
+def get_copy_default_policy_statement(project_code: str) -> Insert:
+    """Build INSERT ... SELECT statement copying casbin rules of the default project to project."""
+    default_rules = (
+        select(literal('p'), CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3, literal(project_code))
+        .where(CasbinRule.v4 == DEFAULT_PROJECT_CODE)
+        .order_by(CasbinRule.id)
+    )
+    statement = insert(CasbinRule).from_select(['ptype', 'v0', 'v1', 'v2', 'v3', 'v4'], default_rules)
+    return statement.on_conflict_do_nothing(constraint='casbin_rule_policy_unique')
+
+
+def copy_default_policy(project_code: str) -> int:
+    """Copy casbin rules of the default project to project skipping rules the project has already.
+
+    Rules are copied with a single INSERT ... SELECT statement, so retrying is safe. Returns number of created rules.
+    """
+    try:
+        created = db.session.execute(get_copy_default_policy_statement(project_code)).rowcount
+        db.session.commit()
+        if created:
+            invalidate_project_policies(project_code)
+        return created
+    except Exception as e:
+        db.session.rollback()
+        error_msg = f'Error copying default casbin rules for {project_code} in psql: {str(e)}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
+
+
+def materialize_default_policy(project_code: str) -> bool:
+    """Replace inheritance of default rules with copies of them stored for the project.
+
+    Inherited rules can not be removed individually, so this has to be done before removing project rules. Changes are
+    committed by the caller. Returns whether the project has been inheriting default rules.
+    """
+    inheritance = db.session.query(PolicyInheritanceModel).get(project_code)
+    if inheritance is None:
+        return False
+
+    rule_fields = (CasbinRule.ptype, CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3)
+    project_rules = set(db.session.query(*rule_fields).filter_by(v4=project_code).all())
+    for rule in db.session.query(*rule_fields).filter_by(v4=DEFAULT_PROJECT_CODE).distinct():
+        if rule not in project_rules:
+            db.session.add(
+                CasbinRule(ptype=rule.ptype, v0=rule.v0, v1=rule.v1, v2=rule.v2, v3=rule.v3, v4=project_code)
+            )
+    db.session.delete(inheritance)
+    db.session.flush()
+    return True
+
+
+def get_stored_rules(project_code: str, rules: set[tuple[str, str, str, str]]) -> set[tuple[str, str, str, str]]:
+    """Get role, zone, resource and operation of rules stored for project out of the given ones."""
+    rule_fields = (CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3)
+    stored_rules = db.session.query(*rule_fields).filter(
+        CasbinRule.ptype == 'p', CasbinRule.v4 == project_code, tuple_(*rule_fields).in_(rules)
+    )
+    return {tuple(rule) for rule in stored_rules}
+
+
+def materialize_inherited_rules(project_code: str, rules: set[tuple[str, str, str, str]]) -> bool:
+    """Materialize default policy of project when some of the rules about to be removed are only inherited.
+
+    Rules are given as role, zone, resource and operation. Projects removing only their own or missing rules keep
+    inheriting default rules. Returns whether the default policy has been materialized.
+    """
+    if not rules or db.session.query(PolicyInheritanceModel).get(project_code) is None:
+        return False
+    if not get_stored_rules(DEFAULT_PROJECT_CODE, rules) - get_stored_rules(project_code, rules):
+        return False
+    return materialize_default_policy(project_code)
+
+
 def get_roles_by_code(project_code: str) -> list[str]:
     """Get roles by code."""
     try:
         all_roles = (
-            db.session.query(CasbinRule).filter_by(v4=project_code).with_entities(CasbinRule.v0).distinct().all()
+            db.session.query(CasbinRule)
+            .filter(CasbinRule.v4.in_(get_policy_project_codes(project_code)))
+            .with_entities(CasbinRule.v0)
+            .distinct()
+            .all()
         )
         all_roles = [i[0] for i in all_roles]
         return all_roles
@@ -63,20 +184,60 @@ def get_rules_by_role(project_role: str) -> list[CasbinRule]:
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
 
 
-def get_casbin_rules(resource: str, operation: str, zone: str, project_code: str) -> dict[str, bool]:
-    """Get casbin rules."""
-    all_roles = get_roles_by_code(project_code)
-    rule_model = RuleModel(v1=zone, v2=resource, v3=operation, v4=project_code)
+def get_casbin_rules_matrix(permissions: Iterable[dict[str, Any]], project_code: str) -> list[dict[str, bool]]:
+    """Get casbin rules of project roles for each permission from a single query of project rules.
+
+    Permissions are given as raw column values of permission metadata.
+    """
     try:
-        rules = db.session.query(CasbinRule).filter_by(**rule_model.dict(exclude_unset=True))
-        result = {i: False for i in all_roles if i != 'platform_admin'}
-        for rule in rules:
-            result[rule.v0] = True
+        rules = (
+            db.session.query(CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3)
+            .filter(CasbinRule.v4.in_(get_policy_project_codes(project_code)))
+            .all()
+        )
     except Exception as e:
         error_msg = f'Error getting casbin rules in psql: {str(e)}'
         logger.error(error_msg)
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
-    return result
+
+    all_roles = sorted({rule.v0 for rule in rules if rule.v0 != 'platform_admin'})
+    granted_roles = {}
+    for rule in rules:
+        granted_roles.setdefault((rule.v1, rule.v2, rule.v3), set()).add(rule.v0)
+
+    matrix = []
+    for permission in permissions:
+        result = dict.fromkeys(all_roles, False)
+        for role in granted_roles.get((permission['zone'], permission['resource'], permission['operation']), ()):
+            result[role] = True
+        matrix.append(result)
+    return matrix
+
+
+def get_project_matrix(project_code: str, catalogue: PermissionCatalogue) -> ProjectMatrix:
+    """Build role by permission matrix of project for all permissions of the catalogue."""
+    try:
+        roles = db.session.query(RoleModel).filter_by(project_code=project_code).all()
+    except Exception as e:
+        error_msg = f'Error getting permission matrix in psql: {str(e)}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
+
+    matrix = get_casbin_rules_matrix(catalogue.permissions, project_code)
+    role_columns = [column.key for column in RoleModel.__table__.columns]
+    roles = [({column: getattr(role, column) for column in role_columns}, role.to_dict()) for role in roles]
+
+    content = [catalogue.revision, matrix, [role for _, role in roles]]
+    etag = hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    return ProjectMatrix(
+        permissions={
+            str(permission['id']): permission_roles
+            for permission, permission_roles in zip(catalogue.permissions, matrix)
+        },
+        roles=roles,
+        etag=etag,
+    )
 
 
 def get_permission_metadata_by_ids_bulk(metadata_ids: list[str]) -> list[dict]:
@@ -89,28 +250,60 @@ def get_permission_metadata_by_ids_bulk(metadata_ids: list[str]) -> list[dict]:
     return metadata
 
 
-def create_casbin_rule_bulk(rules: list[dict], project_code: str):
-    """Bulk create rules from list of metadata id's and project roles."""
-    new_rules = []
+def get_role_permission_metadata(rules: dict[str, list[str]]) -> list[tuple[str, PermissionMetadataModel]]:
+    """Get permission metadata of project roles from list of metadata id's with a single query."""
+    metadata_ids = {str(metadata_id) for metadata_list in rules.values() for metadata_id in metadata_list}
+    metadata = {
+        str(permission_metadata.id): permission_metadata
+        for permission_metadata in get_permission_metadata_by_ids_bulk(list(metadata_ids))
+    }
+
+    role_permission_metadata = []
+    for project_role, metadata_list in rules.items():
+        metadata_obj_list = [metadata[str(i)] for i in metadata_list if str(i) in metadata]
+        if not metadata_obj_list:
+            error_msg = f'Permission metadata not found: {metadata_list}'
+            logger.error(error_msg)
+            raise APIException(status_code=EAPIResponseCode.not_found.value, error_msg=error_msg)
+        role_permission_metadata.extend(
+            (project_role, permission_metadata) for permission_metadata in metadata_obj_list
+        )
+    return role_permission_metadata
+
+
+def create_casbin_rule_bulk(rules: dict[str, list[str]], project_code: str) -> int:
+    """Bulk create rules from list of metadata id's and project roles skipping rules that already exist.
+
+    All rules are inserted with a single statement. Returns number of created rules.
+    """
+    if not rules:
+        return 0
+
     try:
-        for project_role, metadata_list in rules.items():
-            metadata_obj_list = get_permission_metadata_by_ids_bulk(metadata_list)
-            for permission_metadata in metadata_obj_list:
-                rule_model = RuleModel(
-                    ptype='p',
-                    v0=project_role,
-                    v1=permission_metadata.zone,
-                    v2=permission_metadata.resource,
-                    v3=permission_metadata.operation,
-                    v4=project_code,
-                )
-                new_rule = CasbinRule(**rule_model.dict(exclude_unset=True))
-                new_rules.append(new_rule)
-        db.session.bulk_save_objects(new_rules)
+        new_rules = {}
+        for project_role, permission_metadata in get_role_permission_metadata(rules):
+            rule_model = RuleModel(
+                ptype='p',
+                v0=project_role,
+                v1=permission_metadata.zone,
+                v2=permission_metadata.resource,
+                v3=permission_metadata.operation,
+                v4=project_code,
+            )
+            new_rule = rule_model.dict(exclude_unset=True)
+            new_rules[tuple(new_rule.values())] = new_rule
+
+        statement = insert(CasbinRule).values(list(new_rules.values()))
+        statement = statement.on_conflict_do_nothing(constraint='casbin_rule_policy_unique')
+        created = db.session.execute(statement).rowcount
         db.session.commit()
+        if created:
+            invalidate_project_policies(project_code)
+        return created
     except APIException as e:
         raise e
     except Exception as e:
+        db.session.rollback()
         error_msg = f'Error bulk creating rules {rules}: {e}'
         logger.error(error_msg)
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
@@ -126,20 +319,14 @@ def create_casbin_rule(project_role: str, resource: str, operation: str, zone: s
         'v3': operation,
         'v4': project_code,
     }
-    try:
-        duplicate = db.session.query(CasbinRule).filter_by(**rule_data)
-    except Exception as e:
-        error_msg = f'Error creating rule in psql: {str(e)}'
-        logger.error(error_msg)
-        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
-
-    if duplicate.count():
-        raise APIException(error_msg='Role already exists', status_code=EAPIResponseCode.conflict.value)
-
     try:
         new_rule = CasbinRule(**rule_data)
         db.session.add(new_rule)
         db.session.commit()
+        invalidate_project_policies(project_code)
+    except IntegrityError:
+        db.session.rollback()
+        raise APIException(error_msg='Role already exists', status_code=EAPIResponseCode.conflict.value)
     except Exception as e:
         error_msg = f'Error creating rule in psql: {str(e)}'
         logger.error(error_msg)
@@ -149,35 +336,142 @@ def create_casbin_rule(project_role: str, resource: str, operation: str, zone: s
 def delete_casbin_rule(project_role: str, resource: str, operation: str, zone: str, project_code: str):
     """Delete a casbin rule."""
     try:
+        materialize_inherited_rules(project_code, {(project_role, zone, resource, operation)})
         rule_model = RuleModel(v0=project_role, v1=zone, v2=resource, v3=operation, v4=project_code)
         db.session.query(CasbinRule).filter_by(**rule_model.dict(exclude_unset=True)).delete()
         db.session.commit()
+        invalidate_project_policies(project_code)
     except Exception as e:
+        db.session.rollback()
         error_msg = f'Error deleting rule in psql: {str(e)}'
         logger.error(error_msg)
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
 
 
-def delete_casbin_rules_bulk(rules: list[dict], project_code: str):
-    """Bulk delete casbin rules from list of metadata id's and project roles."""
+def delete_casbin_rules_bulk(rules: dict[str, list[str]], project_code: str) -> int:
+    """Bulk delete casbin rules from list of metadata id's and project roles.
+
+    All rules are deleted with a single statement. Returns number of deleted rules.
+    """
+    if not rules:
+        return 0
+
     try:
-        for project_role, metadata_list in rules.items():
-            metadata_obj_list = get_permission_metadata_by_ids_bulk(metadata_list)
-            for permission_metadata in metadata_obj_list:
-                rule_model = RuleModel(
-                    v0=project_role,
-                    v1=permission_metadata.zone,
-                    v2=permission_metadata.resource,
-                    v3=permission_metadata.operation,
-                    v4=project_code,
-                )
-                rule_model.dict(exclude_unset=True)
-                db.session.query(CasbinRule).filter_by(**rule_model.dict(exclude_unset=True)).delete()
+        rule_values = {
+            (project_role, permission_metadata.zone, permission_metadata.resource, permission_metadata.operation)
+            for project_role, permission_metadata in get_role_permission_metadata(rules)
+        }
+        materialized = materialize_inherited_rules(project_code, rule_values)
+        deleted = (
+            db.session.query(CasbinRule)
+            .filter(
+                CasbinRule.v4 == project_code,
+                tuple_(CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3).in_(rule_values),
+            )
+            .delete(synchronize_session=False)
+        )
         db.session.commit()
+        if deleted or materialized:
+            invalidate_project_policies(project_code)
+        return deleted
     except APIException as e:
         raise e
     except Exception as e:
-        error_msg = f'Error bulk creating rules {rules}: {e}'
+        db.session.rollback()
+        error_msg = f'Error bulk deleting rules {rules}: {e}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
+
+
+def _get_sync_permissions(rules: dict[str, list[str]]) -> dict[str, tuple[str, str, str]]:
+    """Get zone, resource and operation of all permission metadata by id making sure rules reference known ones."""
+    metadata = {
+        str(permission_metadata.id): (
+            permission_metadata.zone,
+            permission_metadata.resource,
+            permission_metadata.operation,
+        )
+        for permission_metadata in db.session.query(PermissionMetadataModel)
+    }
+    missing_ids = {str(metadata_id) for metadata_list in rules.values() for metadata_id in metadata_list} - set(
+        metadata
+    )
+    if missing_ids:
+        error_msg = f'Permission metadata not found: {sorted(missing_ids)}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.not_found.value, error_msg=error_msg)
+    return metadata
+
+
+def _get_sync_current_rules(
+    roles: list[str], project_code: str, managed_permissions: set[tuple[str, str, str]]
+) -> set[tuple[str, str, str, str]]:
+    """Get rules of project roles for managed permissions including rules the project inherits."""
+    rule_fields = (CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3)
+    stored_rules = db.session.query(*rule_fields).filter(
+        CasbinRule.ptype == 'p', CasbinRule.v4.in_(get_policy_project_codes(project_code)), CasbinRule.v0.in_(roles)
+    )
+    return {tuple(rule) for rule in stored_rules if (rule.v1, rule.v2, rule.v3) in managed_permissions}
+
+
+def _apply_sync_changes(
+    project_code: str, to_create: set[tuple[str, str, str, str]], to_delete: set[tuple[str, str, str, str]]
+) -> dict[str, int]:
+    """Insert and delete project rules without committing the changes."""
+    materialize_inherited_rules(project_code, to_delete)
+    deleted = 0
+    if to_delete:
+        deleted = (
+            db.session.query(CasbinRule)
+            .filter(
+                CasbinRule.v4 == project_code,
+                tuple_(CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3).in_(to_delete),
+            )
+            .delete(synchronize_session=False)
+        )
+    created = 0
+    if to_create:
+        new_rules = [
+            {'ptype': 'p', 'v0': role, 'v1': zone, 'v2': resource, 'v3': operation, 'v4': project_code}
+            for role, zone, resource, operation in to_create
+        ]
+        statement = insert(CasbinRule).values(new_rules)
+        statement = statement.on_conflict_do_nothing(constraint='casbin_rule_policy_unique')
+        created = db.session.execute(statement).rowcount
+    return {'created': created, 'deleted': deleted}
+
+
+def sync_casbin_rules(rules: dict[str, list[str]], project_code: str) -> dict[str, int]:
+    """Make permissions of project roles match the mapping of roles to metadata id's with minimal changes.
+
+    Only roles present in the mapping and rules of known permission metadata are managed, other rules are left intact.
+    Missing rules are inserted and redundant ones deleted in a single transaction. Default rules are copied into an
+    inheriting project only when one of its inherited rules has to be removed. Returns numbers of created and deleted
+    rules.
+    """
+    try:
+        metadata = _get_sync_permissions(rules)
+        desired = {
+            (project_role, *metadata[str(metadata_id)])
+            for project_role, metadata_list in rules.items()
+            for metadata_id in metadata_list
+        }
+        current = _get_sync_current_rules(list(rules), project_code, set(metadata.values()))
+
+        to_create = desired - current
+        to_delete = current - desired
+        if not to_create and not to_delete:
+            return {'created': 0, 'deleted': 0}
+
+        result = _apply_sync_changes(project_code, to_create, to_delete)
+        db.session.commit()
+        invalidate_project_policies(project_code)
+        return result
+    except APIException as e:
+        raise e
+    except Exception as e:
+        db.session.rollback()
+        error_msg = f'Error syncing rules {rules}: {e}'
         logger.error(error_msg)
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
 
@@ -187,26 +481,81 @@ def create_role_record(name: str, project_code: str, is_default: bool):
         role = RoleModel(name=name, project_code=project_code, is_default=is_default)
         db.session.add(role)
         db.session.commit()
+        invalidate_project_policies(project_code)
     except Exception as e:
         error_msg = f'Error creating role record in psql: {str(e)}'
         logger.error(error_msg)
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
 
 
-def list_roles(project_code: str, order_by: str, order_type: str) -> list[dict]:
+def create_project_records(project_code: str, roles: dict[str, bool], inherit_default_policy: bool) -> dict[str, int]:
+    """Create role records and casbin rules of a new project in a single transaction.
+
+    Roles are given as a mapping of role names to their is_default flag. Roles the project has already and rules it has
+    already are skipped, so creation can be retried. Returns numbers of created role records and casbin rules.
+    """
     try:
-        query = db.session.query(RoleModel).filter_by(project_code=project_code, is_default=False)
-        if order_type == 'desc':
-            sort_param = getattr(RoleModel, order_by).desc()
+        existing_roles = {name for (name,) in db.session.query(RoleModel.name).filter_by(project_code=project_code)}
+        new_roles = [
+            RoleModel(name=name, project_code=project_code, is_default=is_default)
+            for name, is_default in roles.items()
+            if name not in existing_roles
+        ]
+        db.session.add_all(new_roles)
+
+        created_rules = 0
+        if inherit_default_policy:
+            db.session.merge(PolicyInheritanceModel(project_code=project_code))
         else:
-            sort_param = getattr(RoleModel, order_by).asc()
-        result = query.order_by(sort_param).all()
-        default_query = db.session.query(RoleModel).filter_by(project_code=project_code, is_default=True)
-        default_result = default_query.order_by(RoleModel.name).all()
+            created_rules = db.session.execute(get_copy_default_policy_statement(project_code)).rowcount
+        db.session.commit()
+        invalidate_project_policies(project_code)
+        return {'roles': len(new_roles), 'rules': created_rules}
+    except Exception as e:
+        db.session.rollback()
+        error_msg = f'Error creating project records for {project_code} in psql: {str(e)}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
+
+
+def validate_role_clone(source_role: str, new_role: str, project_code: str):
+    """Check that source role exists in project and new role does not."""
+    roles = {name for (name,) in db.session.query(RoleModel.name).filter_by(project_code=project_code)}
+    if source_role not in roles:
+        error_msg = f'Role {source_role} not found in project {project_code}'
+        logger.error(error_msg)
+        raise APIException(status_code=EAPIResponseCode.not_found.value, error_msg=error_msg)
+    if new_role in roles:
+        raise APIException(error_msg='Role already exists', status_code=EAPIResponseCode.conflict.value)
+
+
+def clone_role(source_role: str, new_role: str, project_code: str) -> int:
+    """Create record of new project role with copies of casbin rules of source role in a single transaction.
+
+    Rules are copied with a single INSERT ... SELECT statement, including rules the project inherits from the default
+    project. Returns number of copied rules.
+    """
+    validate_role_clone(source_role, new_role, project_code)
+
+    try:
+        source_rules = (
+            select(literal('p'), literal(new_role), CasbinRule.v1, CasbinRule.v2, CasbinRule.v3, literal(project_code))
+            .where(
+                CasbinRule.ptype == 'p',
+                CasbinRule.v0 == source_role,
+                CasbinRule.v4.in_(get_policy_project_codes(project_code)),
+            )
+            .order_by(CasbinRule.id)
+        )
+        statement = insert(CasbinRule).from_select(['ptype', 'v0', 'v1', 'v2', 'v3', 'v4'], source_rules)
+        statement = statement.on_conflict_do_nothing(constraint='casbin_rule_policy_unique')
+        copied = db.session.execute(statement).rowcount
+        db.session.add(RoleModel(name=new_role, project_code=project_code, is_default=False))
+        db.session.commit()
+        invalidate_project_policies(project_code)
+        return copied
     except Exception as e:
-        error_msg = f'Error listing roles in psql: {str(e)}'
+        db.session.rollback()
+        error_msg = f'Error cloning role {source_role} to {new_role} in psql: {str(e)}'
         logger.error(error_msg)
         raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg=error_msg)
-    all_results = [role.to_dict() for role in default_result]
-    all_results += [role.to_dict() for role in result]
-    return all_results
@@ -13,6 +13,7 @@ from app.components.exceptions import NotFound
 from app.components.keycloak.client import KeycloakClient
 from app.components.keycloak.models import Role
 from app.components.keycloak.models import User
+from app.components.keycloak.user_cache import UserCache
 from app.resources.keycloak_api.ops_admin import OperationsAdmin
 
 
@@ -20,32 +21,57 @@ class IdentityCRUD:
     """CRUD for managing user accounts."""
 
     keycloak_client: KeycloakClient
+    operations_admin: OperationsAdmin | None
+    user_cache: UserCache
 
-    def __init__(self, keycloak_client: KeycloakClient) -> None:
+    def __init__(self, keycloak_client: KeycloakClient, user_cache: UserCache | None = None) -> None:
         self.keycloak_client = keycloak_client
+        self.operations_admin = None
+        self.user_cache = UserCache(size=0, ttl=0) if user_cache is None else user_cache
 
     async def create_operations_admin(self) -> OperationsAdmin:
-        """Return an instance of legacy OperationsAdmin class for backward compatibility."""
+        """Return an instance of legacy OperationsAdmin class for backward compatibility.
+
+        The instance is created once and reused, its headers are refreshed in place when the access token rotates.
+        """
 
         if self.keycloak_client.is_authorization_expiring_soon:
             await self.keycloak_client.authorize()
 
+        headers = self.keycloak_client.headers | {'Content-Type': 'application/json'}
+        if self.operations_admin is None:
+            self.operations_admin = self._build_operations_admin(headers)
+        elif self.operations_admin.header != headers:
+            self.operations_admin.set_headers(headers)
+
+        return self.operations_admin
+
+    def _build_operations_admin(self, headers: dict[str, str]) -> OperationsAdmin:
         server_url = f'{self.keycloak_client.server_url}/'
         realm_name = self.keycloak_client.realm
-        headers = self.keycloak_client.headers | {'Content-Type': 'application/json'}
         keycloak_admin = KeycloakAdmin(server_url=server_url, realm_name=realm_name)
         keycloak_admin.connection = ConnectionManager(
             base_url=server_url, headers=headers, timeout=self.keycloak_client.client.timeout
         )
-        operations_admin = OperationsAdmin(keycloak_admin=keycloak_admin, realm_name=realm_name, headers=headers)
+        operations_admin = OperationsAdmin(
+            keycloak_admin=keycloak_admin,
+            realm_name=realm_name,
+            headers=headers,
+            client=self.keycloak_client.client,
+            user_cache=self.user_cache,
+        )
 
         return operations_admin
 
     async def get_user_by_username(self, username: str) -> User | None:
-        try:
-            return await self.keycloak_client.get_user_by_username(username)
-        except NotFound:
-            return None
+        async def load_user() -> User | None:
+            try:
+                return await self.keycloak_client.get_user_by_username(username)
+            except NotFound:
+                return None
+
+        user = await self.user_cache.get('username', username, load_user)
+        return None if user is None else User(user)
 
     async def get_user_realm_roles(self, user_id: UUID | str) -> list[Role]:
         if isinstance(user_id, str):
@@ -9,9 +9,29 @@ from fastapi import Depends
 from app.components.identity.crud import IdentityCRUD
 from app.components.keycloak.client import KeycloakClient
 from app.components.keycloak.dependencies import get_keycloak_client
+from app.components.keycloak.user_cache import UserCache
+from app.config import Settings
+from app.config import get_settings
 
 
-def get_identity_crud(keycloak_client: KeycloakClient = Depends(get_keycloak_client)) -> IdentityCRUD:
-    """Return an instance of IdentityCRUD as a dependency."""
+class GetIdentityCRUD:
+    """Create a FastAPI callable dependency for IdentityCRUD single instance."""
 
-    return IdentityCRUD(keycloak_client)
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def __call__(
+        self,
+        keycloak_client: KeycloakClient = Depends(get_keycloak_client),
+        settings: Settings = Depends(get_settings),
+    ) -> IdentityCRUD:
+        """Return an instance of IdentityCRUD class bound to the current KeycloakClient instance."""
+
+        if not self.instance or self.instance.keycloak_client is not keycloak_client:
+            user_cache = UserCache(size=settings.KEYCLOAK_USER_CACHE_SIZE, ttl=settings.KEYCLOAK_USER_CACHE_TTL)
+            self.instance = IdentityCRUD(keycloak_client, user_cache)
+
+        return self.instance
+
+
+get_identity_crud = GetIdentityCRUD()
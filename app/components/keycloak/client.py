@@ -4,6 +4,7 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 import time as tm
 from collections.abc import Mapping
 from enum import Enum
@@ -14,11 +15,13 @@ from uuid import UUID
 from httpx import AsyncClient
 from httpx import AsyncHTTPTransport
 from httpx import HTTPStatusError
+from httpx import Limits
 from httpx import Response
 
 from app.components.exceptions import NotFound
 from app.components.keycloak.models import Role
 from app.components.keycloak.models import User
+from app.logger import logger
 
 
 class GrantTypes(str, Enum):
@@ -46,6 +49,11 @@ class KeycloakClient:
         grant_type: list[GrantTypes],
         timeout: int = 10,
         retries: int = 1,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30,
+        token_refresh_margin: int = 30,
+        token_refresh_retry_delay: float = 5,
     ) -> None:
         self.server_url = server_url.rstrip('/')
         self.realm = realm
@@ -55,7 +63,18 @@ class KeycloakClient:
 
         self.access_token = 'missing'
         self.access_token_expiration = 0
-        self.client = AsyncClient(timeout=timeout, transport=AsyncHTTPTransport(retries=retries))
+        self.token_refresh_margin = token_refresh_margin
+        self.token_refresh_retry_delay = token_refresh_retry_delay
+        self._authorization: asyncio.Task | None = None
+        self._authorization_refresh: asyncio.Task | None = None
+        limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.client = AsyncClient(
+            timeout=timeout, limits=limits, transport=AsyncHTTPTransport(retries=retries, limits=limits)
+        )
 
     @property
     def headers(self) -> dict[str, Any]:
@@ -80,12 +99,14 @@ class KeycloakClient:
         url = f'{self.server_url}/{path}'
 
         try:
+            access_token = self.access_token
             response = await self.client.request(method, url, json=json, params=params, headers=self.headers)
             if response.status_code != HTTPStatus.UNAUTHORIZED:
                 response.raise_for_status()
                 return response
 
-            await self.authorize()
+            if self.access_token == access_token:
+                await self.authorize()
 
             response = await self.client.request(method, url, json=json, params=params, headers=self.headers)
             response.raise_for_status()
@@ -95,14 +116,56 @@ class KeycloakClient:
                 raise NotFound
             raise e
 
+    def start_authorization_refresh(self) -> None:
+        """Start background task refreshing access token before it expires."""
+
+        if self._authorization_refresh is None:
+            self._authorization_refresh = asyncio.create_task(self._refresh_authorization())
+
+    async def _refresh_authorization(self) -> None:
+        while True:
+            expires_in = self.access_token_expiration - tm.monotonic()
+            await asyncio.sleep(max(expires_in - self.token_refresh_margin, expires_in / 2, 1))
+            try:
+                await self.authorize()
+            except Exception as e:
+                logger.error(f'Failed to refresh Keycloak access token: {e}')
+                await asyncio.sleep(self.token_refresh_retry_delay)
+
+    async def close(self) -> None:
+        """Stop access token refresh and close pooled connections of the underlying http client."""
+
+        if self._authorization_refresh is not None:
+            self._authorization_refresh.cancel()
+            await asyncio.gather(self._authorization_refresh, return_exceptions=True)
+            self._authorization_refresh = None
+
+        await self.client.aclose()
+
     async def _get(self, path: str, params: Mapping[str, Any] | None = None) -> Response:
         """Send GET request."""
 
         return await self._request('GET', path, params=params)
 
     async def authorize(self) -> None:
-        """Request access token using client credentials."""
+        """Request access token using client credentials.
+
+        Only one token request is in flight at a time, concurrent callers wait for its result instead of making their
+        own requests.
+        """
+
+        if self._authorization is None:
+            self._authorization = asyncio.create_task(self._authorize())
+
+        await asyncio.shield(self._authorization)
+
+    async def _authorize(self) -> None:
+        try:
+            await self._request_token()
+        finally:
+            self._authorization = None
 
+    async def _request_token(self) -> None:
         url = f'{self.server_url}/realms/{self.realm}/protocol/openid-connect/token'
         data = {
             'scope': 'openid',
@@ -29,10 +29,22 @@ class GetKeycloakClient:
                 client_secret=settings.KEYCLOAK_SECRET,
                 grant_type=[GrantTypes.CLIENT_CREDENTIALS],
                 timeout=settings.SERVICE_CLIENT_TIMEOUT,
+                max_connections=settings.KEYCLOAK_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.KEYCLOAK_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.KEYCLOAK_HTTP_KEEPALIVE_EXPIRY,
+                token_refresh_margin=settings.KEYCLOAK_TOKEN_REFRESH_MARGIN,
             )
             await self.instance.authorize()
+            self.instance.start_authorization_refresh()
 
         return self.instance
 
+    async def close(self) -> None:
+        """Close connection pool of the KeycloakClient instance if it was created."""
+
+        if self.instance:
+            await self.instance.close()
+            self.instance = None
+
 
 get_keycloak_client = GetKeycloakClient()
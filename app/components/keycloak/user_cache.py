@@ -0,0 +1,123 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time as tm
+from collections import Counter
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from copy import deepcopy
+from typing import Any
+
+USER_FIELDS = ('id', 'username', 'email')
+
+
+class UserCache:
+    """Bounded LRU cache of realm user representations looked up by id, username or email.
+
+    Every cached user can be found by any of its fields and expires after ttl seconds. Concurrent lookups of the same
+    missing user share a single load. Writes touching a user must invalidate it, users loaded while an invalidation
+    happened are not stored. Other workers only see the change once the ttl passes. Cache with zero size or ttl is
+    disabled and always loads users.
+    """
+
+    def __init__(self, size: int, ttl: float) -> None:
+        self.size = size
+        self.ttl = ttl
+
+        self.stats = Counter()
+        self._users: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._user_ids: dict[tuple[str, str], str] = {}
+        self._loads: dict[tuple[str, str], asyncio.Task] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and self.ttl > 0
+
+    async def get(
+        self, field: str, value: str, load: Callable[[], Awaitable[dict[str, Any] | None]]
+    ) -> dict[str, Any] | None:
+        """Return copy of user with field equal to value loading it with load callable when it is not cached.
+
+        Missing users are not cached.
+        """
+
+        if not self.enabled:
+            return await load()
+
+        key = (field, str(value))
+        user_id = self._user_ids.get(key)
+        if user_id is not None:
+            created_at, user = self._users[user_id]
+            if tm.monotonic() < created_at + self.ttl:
+                self._users.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return deepcopy(user)
+            self._remove(user_id)
+        self.stats['misses'] += 1
+
+        task = self._loads.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, load))
+            self._loads[key] = task
+
+        user = await asyncio.shield(task)
+        return deepcopy(user)
+
+    def invalidate(self, user_id: str) -> None:
+        """Remove user from the cache and discard users being loaded at the moment."""
+
+        self._generation += 1
+        self._remove(str(user_id))
+
+    def clear(self) -> None:
+        """Remove all users."""
+
+        self._generation += 1
+        self._users.clear()
+        self._user_ids.clear()
+
+    async def _load(self, key: tuple[str, str], load: Callable[[], Awaitable[dict[str, Any] | None]]) -> dict | None:
+        generation = self._generation
+        try:
+            user = await load()
+        finally:
+            del self._loads[key]
+
+        if user is not None and generation == self._generation:
+            self._store(user)
+        self.stats['loads'] += 1
+
+        return user
+
+    def _store(self, user: dict[str, Any]) -> None:
+        user_id = str(user['id'])
+        self._remove(user_id)
+
+        self._users[user_id] = (tm.monotonic(), deepcopy(user))
+        for field in USER_FIELDS:
+            if user.get(field) is not None:
+                self._user_ids[field, str(user[field])] = user_id
+
+        while len(self._users) > self.size:
+            self._remove(next(iter(self._users)))
+            self.stats['evictions'] += 1
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return
+
+        user = entry[1]
+        for field in USER_FIELDS:
+            key = (field, str(user.get(field)))
+            if self._user_ids.get(key) == user_id:
+                del self._user_ids[key]
@@ -71,6 +71,12 @@ class Settings(BaseSettings):
     KEYCLOAK_CLIENT_ID: str
     KEYCLOAK_SECRET: str
     KEYCLOAK_REALM: str
+    KEYCLOAK_HTTP_MAX_CONNECTIONS: int = 100
+    KEYCLOAK_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    KEYCLOAK_HTTP_KEEPALIVE_EXPIRY: int = 30
+    KEYCLOAK_TOKEN_REFRESH_MARGIN: int = 30
+    KEYCLOAK_USER_CACHE_SIZE: int = 1024
+    KEYCLOAK_USER_CACHE_TTL: int = 30
 
     DOMAIN_NAME: str
     START_PATH: str
@@ -104,6 +110,24 @@ class Settings(BaseSettings):
 
     ROLE_NAME_REGEX: str = '^[a-zA-Z0-9_]*$'
 
+    # Casbin policy caching
+    CASBIN_ENFORCER_POOL_SIZE: int = 512
+    CASBIN_ENFORCER_POOL_TTL: int = 300
+    CASBIN_ENFORCER_POOL_FALLBACK_TTL: int = 5
+    CASBIN_COMPILED_POLICY_ENABLED: bool = True
+    CASBIN_DECISION_CACHE_SIZE: int = 65536
+    PERMISSION_MATRIX_CACHE_SIZE: int = 256
+    PERMISSION_CATALOGUE_CHECK_INTERVAL: int = 60
+    CASBIN_POLICY_BROADCAST_ENABLED: bool = True
+    CASBIN_POLICY_BROADCAST_CHANNEL: str = 'service_auth:casbin:invalidate'
+    CASBIN_POLICY_LISTEN_ENABLED: bool = False
+    CASBIN_ASYNC_POLICY_LOADER_ENABLED: bool = True
+    CASBIN_ASYNC_POLICY_LOADER_POOL_SIZE: int = 10
+    CASBIN_ASYNC_POLICY_LOADER_MAX_OVERFLOW: int = 10
+
+    # Provision new projects inheriting pilotdefault casbin rules instead of copying them
+    CASBIN_DEFAULT_POLICY_INHERITANCE_ENABLED: bool = False
+
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
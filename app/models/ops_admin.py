@@ -4,6 +4,8 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from enum import Enum
+
 from pydantic import BaseModel
 from pydantic import Field
 
@@ -30,6 +32,12 @@ class RealmRolesPOST(BaseModel):
     project_code: str
 
 
+class RoleClonePOST(BaseModel):
+    project_code: str
+    source_role: str
+    new_role: str
+
+
 class UserInRolePOST(BaseModel):
     role_names: list
     username: str = None
@@ -43,3 +51,27 @@ class UserInRolePOST(BaseModel):
 
 class GETUserStatsResponse(APIResponse):
     result: dict = Field({}, example={'admin': 20, 'contributor': 5, 'collaborator': 10})
+
+
+class ProjectOnboardingStep(str, Enum):
+    REALM_ROLES = 'realm_roles'
+    DATABASE = 'database'
+    DIRECTORY_GROUP = 'directory_group'
+
+
+class ProjectOnboardingPOST(BaseModel):
+    project_code: str
+    project_roles: list[str] = ['admin', 'contributor', 'collaborator']
+    description: str = ''
+    steps: list[ProjectOnboardingStep] = list(ProjectOnboardingStep)
+
+
+class ProjectOnboardingPOSTResponse(APIResponse):
+    result: dict = Field(
+        {},
+        example={
+            'realm_roles': {'status': 'completed', 'duration_ms': 85.2, 'details': {'created': ['project-admin']}},
+            'database': {'status': 'completed', 'duration_ms': 21.4, 'details': {'roles': 3, 'rules': 120}},
+            'directory_group': {'status': 'failed', 'duration_ms': 240.9, 'error': 'Error connecting to FreeIPA'},
+        },
+    )
@@ -10,6 +10,7 @@ from uuid import uuid4
 from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import DateTime
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import UniqueConstraint
@@ -20,10 +21,16 @@ from app.config import ConfigSettings
 
 Base = declarative_base()
 
+DEFAULT_PROJECT_CODE = 'pilotdefault'
+
 
 class CasbinRule(Base):
     __tablename__ = 'casbin_rule'
-    __table_args__ = {'schema': ConfigSettings.RDS_SCHEMA_PREFIX + '_casbin'}
+    __table_args__ = (
+        UniqueConstraint('v4', 'v2', 'v3', 'v1', 'v0', 'ptype', name='casbin_rule_policy_unique'),
+        Index('ix_casbin_rule_v4_id', 'v4', 'id', postgresql_include=['ptype', 'v0', 'v1', 'v2', 'v3', 'v5']),
+        {'schema': ConfigSettings.RDS_SCHEMA_PREFIX + '_casbin'},
+    )
 
     id = Column(Integer, primary_key=True)
     ptype = Column(String(255))
@@ -31,7 +38,7 @@ class CasbinRule(Base):
     v1 = Column(String(255))
     v2 = Column(String(255))
     v3 = Column(String(255))
-    v4 = Column(String(255), index=True)
+    v4 = Column(String(255))
     v5 = Column(String(255))
 
     def __str__(self):
@@ -46,6 +53,16 @@ class CasbinRule(Base):
         return f'<CasbinRule {self.id}: "{self}">'
 
 
+class PolicyInheritanceModel(Base):
+    """Marks project inheriting casbin rules of the default project instead of storing copies of them."""
+
+    __tablename__ = 'policy_inheritance'
+    __table_args__ = {'schema': ConfigSettings.RDS_SCHEMA_PREFIX + '_casbin'}
+
+    project_code = Column(String(255), primary_key=True)
+    time_created = Column(DateTime(), default=datetime.utcnow)
+
+
 class PermissionMetadataModel(Base):
     __tablename__ = 'permission_metadata'
     __table_args__ = (UniqueConstraint('resource', 'operation', name='resource_operation_unique'),)
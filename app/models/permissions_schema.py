@@ -72,6 +72,22 @@ class DeletePermissionsBulk(BaseModel):
     rules: dict[str, list[str]]
 
 
+class SyncPermissions(BaseModel):
+    """Sync casbin permissions request model."""
+
+    project_code: str
+    rules: dict[str, list[str]]
+
+
+class SyncPermissionsResponse(APIResponse):
+    """Sync casbin permissions response model."""
+
+    result: dict = Field(
+        {},
+        example={'created': 2, 'deleted': 1},
+    )
+
+
 class CreateRole(BaseModel):
     """Create role request model."""
 
@@ -118,3 +134,28 @@ class ListRolesResponse(APIResponse):
             }
         ],
     )
+
+
+class AuthorizeCheck(BaseModel):
+    """Single authorization check model."""
+
+    role: str
+    zone: str
+    resource: str
+    operation: str
+    project_code: str = 'pilotdefault'
+
+
+class AuthorizeBatch(BaseModel):
+    """Batch authorization request model."""
+
+    checks: list[AuthorizeCheck] = Field(..., max_items=1000)
+
+
+class AuthorizeBatchResponse(APIResponse):
+    """Batch authorization response model."""
+
+    result: list = Field(
+        [],
+        example=[{'has_permission': True}, {'has_permission': False}],
+    )
@@ -4,24 +4,51 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 from typing import Any
 
 import httpx
 from keycloak import KeycloakAdmin
 from keycloak import exceptions
-from requests import Response
 
+from app.components.keycloak.user_cache import UserCache
 from app.config import ConfigSettings
 
 
 class OperationsAdmin:
 
     keycloak_admin: KeycloakAdmin
-
-    def __init__(self, keycloak_admin: KeycloakAdmin, realm_name: str, headers: dict[str, Any]) -> None:
+    client: httpx.AsyncClient
+    user_cache: UserCache
+    realm_roles: dict[str, dict[str, Any]]
+
+    def __init__(
+        self,
+        keycloak_admin: KeycloakAdmin,
+        realm_name: str,
+        headers: dict[str, Any],
+        client: httpx.AsyncClient,
+        user_cache: UserCache,
+    ) -> None:
         self.keycloak_admin = keycloak_admin
         self.realm_name = realm_name
         self.header = headers
+        self.client = client
+        self.user_cache = user_cache
+        self.realm_roles = {}
+
+    def set_headers(self, headers: dict[str, Any]) -> None:
+        """
+        Summary:
+            the function will replace the headers used by both native keycloak
+            api calls and python keycloak client, e.g. after access token rotation
+
+        Parameter:
+            - headers(dict): the new request headers
+        """
+
+        self.header = headers
+        self.keycloak_admin.connection.headers = headers
 
     async def get_user_id(self, username: str) -> str:
         """
@@ -51,8 +78,7 @@ class OperationsAdmin:
             - user(dict): the user infomation from keycloak
         """
 
-        user = await self.keycloak_admin.get_user(user_id)
-        return user
+        return await self.user_cache.get('id', user_id, lambda: self.keycloak_admin.get_user(user_id))
 
     async def get_user_by_email(self, email: str) -> dict:
         """
@@ -67,8 +93,11 @@ class OperationsAdmin:
             - user(dict): the user infomation from keycloak
         """
 
-        users = await self.keycloak_admin.get_users({'email': email})
-        return next((user for user in users if user['email'] == email), None)
+        async def load_user() -> dict | None:
+            users = await self.keycloak_admin.get_users({'email': email})
+            return next((user for user in users if user['email'] == email), None)
+
+        return await self.user_cache.get('email', email, load_user)
 
     async def get_user_by_username(self, username: str) -> dict:
         """
@@ -83,9 +112,11 @@ class OperationsAdmin:
             - user(dict): the user infomation from keycloak
         """
 
-        user_id = await self.keycloak_admin.get_user_id(username)
-        user = await self.keycloak_admin.get_user(user_id)
-        return user
+        async def load_user() -> dict:
+            user_id = await self.keycloak_admin.get_user_id(username)
+            return await self.keycloak_admin.get_user(user_id)
+
+        return await self.user_cache.get('username', username, load_user)
 
     async def update_user_attributes(self, user_id: str, new_attributes: dict) -> dict:
         """
@@ -108,17 +139,11 @@ class OperationsAdmin:
         attributes = user_info.get('attributes', {})
         attributes.update(new_attributes)
 
-        async with httpx.AsyncClient() as client:
-            api = (
-                ConfigSettings.KEYCLOAK_SERVER_URL
-                + 'admin/realms/'
-                + ConfigSettings.KEYCLOAK_REALM
-                + '/users/'
-                + user_id
-            )
-            api_res = await client.put(api, headers=self.header, json={'attributes': attributes})
-            if api_res.status_code != 204:
-                raise Exception('Fail to update user attributes: ' + str(api_res.__dict__))
+        api = ConfigSettings.KEYCLOAK_SERVER_URL + 'admin/realms/' + ConfigSettings.KEYCLOAK_REALM + '/users/' + user_id
+        api_res = await self.client.put(api, headers=self.header, json={'attributes': attributes})
+        self.user_cache.invalidate(user_id)
+        if api_res.status_code != 204:
+            raise Exception('Fail to update user attributes: ' + str(api_res.__dict__))
 
         return new_attributes
 
@@ -152,10 +177,9 @@ class OperationsAdmin:
         }
 
         api = ConfigSettings.KEYCLOAK_SERVER_URL + 'admin/realms/' + ConfigSettings.KEYCLOAK_REALM + '/users'
-        async with httpx.AsyncClient() as client:
-            api_res = await client.get(api, headers=self.header, params=query)
-            if api_res.status_code != 200:
-                raise Exception('Fail to get all user: ' + str(api_res.__dict__))
+        api_res = await self.client.get(api, headers=self.header, params=query)
+        if api_res.status_code != 200:
+            raise Exception('Fail to get all user: ' + str(api_res.__dict__))
 
         return api_res.json()
 
@@ -189,10 +213,9 @@ class OperationsAdmin:
         }
 
         api = ConfigSettings.KEYCLOAK_SERVER_URL + 'admin/realms/' + ConfigSettings.KEYCLOAK_REALM + '/users/count'
-        async with httpx.AsyncClient() as client:
-            api_res = await client.get(api, headers=self.header, params=query)
-            if api_res.status_code != 200:
-                raise Exception('Fail to get user count: ' + str(api_res.__dict__))
+        api_res = await self.client.get(api, headers=self.header, params=query)
+        if api_res.status_code != 200:
+            raise Exception('Fail to get user count: ' + str(api_res.__dict__))
         return api_res.json()
 
     async def assign_user_role(self, user_id, role_name) -> bytes:
@@ -207,15 +230,59 @@ class OperationsAdmin:
         Return:
             bytes
         """
-        realm_roles = await self.keycloak_admin.get_realm_roles()
-
-        find_role = [role for role in realm_roles if role['name'] == role_name]
-        if len(find_role) == 0:
+        role = await self.get_realm_role(role_name)
+        if role is None:
             raise Exception('Failed to find the role')
 
-        res = await self.keycloak_admin.assign_realm_roles(user_id=user_id, roles=find_role)
+        try:
+            res = await self.keycloak_admin.assign_realm_roles(user_id=user_id, roles=[role])
+        except Exception:
+            self.realm_roles.pop(role_name, None)
+            raise
+        self.user_cache.invalidate(user_id)
         return res
 
+    async def get_realm_role(self, role_name: str) -> dict | None:
+        """
+        Summary:
+            the function will return the realm role from the role index,
+            the role is looked up by name in keycloak when it is not indexed yet
+
+        Parameter:
+            - role_name(string): the role name from keycloak
+
+        Return:
+            role information(dict) or None if the role does not exist
+        """
+
+        role = self.realm_roles.get(role_name)
+        if role is None:
+            try:
+                role = await self.keycloak_admin.get_realm_role(role_name=role_name)
+            except exceptions.KeycloakGetError as e:
+                if e.response_code == 404:
+                    return None
+                raise
+            self.realm_roles[role_name] = role
+
+        return role
+
+    async def set_user_enabled(self, user_id: str, enabled: bool) -> None:
+        """
+        Summary:
+            the function will enable or disable the user in keycloak
+
+        Parameter:
+            - user_id(string): the user id (hash) in keycloak
+            - enabled(bool): whether the user can log in
+
+        Return:
+            None
+        """
+
+        await self.keycloak_admin.update_user(user_id, payload={'enabled': enabled})
+        self.user_cache.invalidate(user_id)
+
     async def get_user_realm_roles(self, user_id: str) -> list:
         """
         Summary:
@@ -229,18 +296,17 @@ class OperationsAdmin:
             list of the realm roles
         """
 
-        async with httpx.AsyncClient() as client:
-            api = (
-                ConfigSettings.KEYCLOAK_SERVER_URL
-                + 'admin/realms/'
-                + ConfigSettings.KEYCLOAK_REALM
-                + '/users/'
-                + user_id
-                + '/role-mappings/realm'
-            )
-            api_res = await client.get(api, headers=self.header)
-            if api_res.status_code != 200:
-                raise Exception('Fail to get user realm roles: ' + str(api_res.__dict__))
+        api = (
+            ConfigSettings.KEYCLOAK_SERVER_URL
+            + 'admin/realms/'
+            + ConfigSettings.KEYCLOAK_REALM
+            + '/users/'
+            + user_id
+            + '/role-mappings/realm'
+        )
+        api_res = await self.client.get(api, headers=self.header)
+        if api_res.status_code != 200:
+            raise Exception('Fail to get user realm roles: ' + str(api_res.__dict__))
 
         return api_res.json()
 
@@ -257,43 +323,49 @@ class OperationsAdmin:
             None
         """
 
-        async with httpx.AsyncClient() as client:
-            api = (
-                ConfigSettings.KEYCLOAK_SERVER_URL
-                + 'admin/realms/'
-                + ConfigSettings.KEYCLOAK_REALM
-                + '/users/'
-                + user_id
-                + '/role-mappings/realm'
-            )
-            request = httpx.Request('DELETE', api, headers=self.header, json=realm_roles)
-            api_res = await client.send(request)
-            if api_res.status_code > 300:
-                raise Exception('Fail to remove user from realm: ' + str(api_res.__dict__))
+        api = (
+            ConfigSettings.KEYCLOAK_SERVER_URL
+            + 'admin/realms/'
+            + ConfigSettings.KEYCLOAK_REALM
+            + '/users/'
+            + user_id
+            + '/role-mappings/realm'
+        )
+        request = httpx.Request('DELETE', api, headers=self.header, json=realm_roles)
+        api_res = await self.client.send(request)
+        self.user_cache.invalidate(user_id)
+        if api_res.status_code > 300:
+            raise Exception('Fail to remove user from realm: ' + str(api_res.__dict__))
 
-    async def create_project_realm_roles(self, project_roles: list, code: str) -> Response | None:
+    async def create_project_realm_roles(self, project_roles: list, code: str, exist_ok: bool = False) -> list[str]:
         """
         Summary:
             the function will use the native the keycloak api to create
-            a realm role
+            realm roles of the project concurrently
 
         Parameter:
             - project_roles(list): the list of project roles will be admin,
                 collaborator, contributor
             - code(string): The project code
+            - exist_ok(bool): skip roles that already exist instead of failing
 
         Return:
-            None
+            list of created realm role names
         """
 
-        for role in project_roles:
-            payload = {'name': f'{code}-{role}'}
-            url = f'{ConfigSettings.KEYCLOAK_SERVER_URL}admin/realms/{ConfigSettings.KEYCLOAK_REALM}/roles'
-            async with httpx.AsyncClient() as client:
-                res = await client.post(url=url, headers=self.header, json=payload)
-                if res.status_code != 201:
-                    raise Exception('Fail to create new role' + str(res.__dict__))
-        return res
+        url = f'{ConfigSettings.KEYCLOAK_SERVER_URL}admin/realms/{ConfigSettings.KEYCLOAK_REALM}/roles'
+
+        async def create_role(role_name: str) -> str | None:
+            res = await self.client.post(url=url, headers=self.header, json={'name': role_name})
+            self.realm_roles.pop(role_name, None)
+            if exist_ok and res.status_code == 409:
+                return None
+            if res.status_code != 201:
+                raise Exception('Fail to create new role' + str(res.__dict__))
+            return role_name
+
+        role_names = await asyncio.gather(*(create_role(f'{code}-{role}') for role in project_roles))
+        return [role_name for role_name in role_names if role_name is not None]
 
     async def delete_role_of_user(self, user_id: str, role_name: str):
         """
@@ -309,15 +381,15 @@ class OperationsAdmin:
             None
         """
 
-        realm_roles = await self.keycloak_admin.get_realm_roles()
-        find_role = [role for role in realm_roles if role['name'] == role_name]
-
-        if len(find_role) == 0:
+        role = await self.get_realm_role(role_name)
+        if role is None:
             raise Exception(f'User {user_id} does not have role {role_name}')
 
         url = f'{ConfigSettings.KEYCLOAK_SERVER_URL}admin/realms/{self.realm_name}/users/{user_id}/role-mappings/realm'
-        async with httpx.AsyncClient() as client:
-            delete_res = await client.request('DELETE', url, json=find_role, headers=self.header)
+        delete_res = await self.client.request('DELETE', url, json=[role], headers=self.header)
+        if delete_res.status_code == 404:
+            self.realm_roles.pop(role_name, None)
+        self.user_cache.invalidate(user_id)
         return delete_res
 
     async def get_users_in_role(self, role_name: str) -> list:
@@ -336,26 +408,27 @@ class OperationsAdmin:
                 - email
         """
 
-        async with httpx.AsyncClient() as client:
-            api = (
-                ConfigSettings.KEYCLOAK_SERVER_URL
-                + 'admin/realms/'
-                + ConfigSettings.KEYCLOAK_REALM
-                + '/roles/'
-                + role_name
-                + '/users'
-            )
-            api_res = await client.get(api, headers=self.header)
+        api = (
+            ConfigSettings.KEYCLOAK_SERVER_URL
+            + 'admin/realms/'
+            + ConfigSettings.KEYCLOAK_REALM
+            + '/roles/'
+            + role_name
+            + '/users'
+        )
+        api_res = await self.client.get(api, headers=self.header)
 
-            if api_res.status_code == 404:
-                raise Exception(f'Role {role_name} is not found')
+        if api_res.status_code == 404:
+            raise Exception(f'Role {role_name} is not found')
 
         return api_res.json()
 
     async def sync_user_trigger(self):
         url = f'{ConfigSettings.KEYCLOAK_SERVER_URL}admin/realms/{ConfigSettings.KEYCLOAK_REALM}/user-storage/{ConfigSettings.KEYCLOAK_ID}/sync?action=triggerChangedUsersSync'  # noqa:E501
-        async with httpx.AsyncClient() as client:
-            res = await client.post(url=url, headers=self.header)
+        res = await self.client.post(url=url, headers=self.header)
+        if res.is_success:
+            # Sync may change attributes and groups of any user, so none of the cached users is up to date anymore
+            self.user_cache.clear()
         return res
 
     async def get_group_by_name(self, group_name: str) -> dict | None:
@@ -402,6 +475,7 @@ class OperationsAdmin:
         """
 
         await self.keycloak_admin.group_user_add(user_id, group_id)
+        self.user_cache.invalidate(user_id)
 
     async def remove_user_from_group(self, user_id: str, group_id: str) -> None:
         """
@@ -416,6 +490,7 @@ class OperationsAdmin:
             None
         """
         await self.keycloak_admin.group_user_remove(user_id, group_id)
+        self.user_cache.invalidate(user_id)
 
     async def check_user_exists(self, email: str) -> bool:
         try:
@@ -5,6 +5,7 @@
 # You may not use this file except in compliance with the License.
 
 import math
+import re
 from datetime import datetime
 
 from fastapi import APIRouter
@@ -13,15 +14,23 @@ from fastapi.concurrency import run_in_threadpool
 from fastapi_utils import cbv
 from keycloak import exceptions
 
+from app.commons.project_onboarding import ProjectOnboardingError
+from app.commons.project_onboarding import ProjectOnboardingPipeline
+from app.commons.psql_services.permissions import clone_role
 from app.commons.psql_services.permissions import create_role_record
+from app.commons.psql_services.permissions import validate_role_clone
 from app.components.identity.crud import IdentityCRUD
 from app.components.identity.dependencies import get_identity_crud
+from app.config import ConfigSettings
 from app.logger import AuditLog
 from app.logger import logger
 from app.models.api_response import APIResponse
 from app.models.api_response import EAPIResponseCode
 from app.models.ops_admin import GETUserStatsResponse
+from app.models.ops_admin import ProjectOnboardingPOST
+from app.models.ops_admin import ProjectOnboardingPOSTResponse
 from app.models.ops_admin import RealmRolesPOST
+from app.models.ops_admin import RoleClonePOST
 from app.models.ops_admin import UserGroupPOST
 from app.models.ops_admin import UserInRolePOST
 from app.models.ops_admin import UserOpsPOST
@@ -313,6 +322,113 @@ class RealmRoles:
         return res.json_response()
 
 
+@cbv.cbv(router)
+class ProjectOnboarding:
+    identity_crud: IdentityCRUD = Depends(get_identity_crud)
+
+    @router.post(
+        '/admin/projects/onboarding',
+        tags=[_API_TAG],
+        response_model=ProjectOnboardingPOSTResponse,
+        summary='onboard project to keycloak, database and directory',
+    )
+    @catch_internal(_API_NAMESPACE)
+    async def post(self, data: ProjectOnboardingPOST):
+        """
+        Summary:
+            The api is used to create everything a new project needs with
+            a single call. Keycloak realm roles, the role records with casbin
+            rules and the directory group are created concurrently. Every step
+            skips what exists already, so failed onboarding can be resumed by
+            calling the api again, optionally with the failed steps only.
+
+        Payload:
+            - project_code(string): the unique code of project.
+            - project_roles(list): the list of roles to create.
+            - description(string): the description of directory group.
+            - steps(list): the steps to run, all of them by default.
+
+        Return:
+            - 200 outcome and duration of every step
+            - 400 when any role name is invalid
+            - 500 when any step has failed
+        """
+
+        res = APIResponse()
+        invalid_roles = [
+            role for role in data.project_roles if not role or not re.fullmatch(ConfigSettings.ROLE_NAME_REGEX, role)
+        ]
+        if invalid_roles:
+            res.error_msg = f'Invalid role names {invalid_roles}'
+            res.code = EAPIResponseCode.bad_request
+            return res.json_response()
+
+        onboarding = ProjectOnboardingPipeline(
+            self.identity_crud, data.project_code, data.project_roles, data.description
+        )
+        try:
+            with AuditLog(
+                'onboard project',
+                project_code=data.project_code,
+                project_roles=data.project_roles,
+                steps=[step.value for step in data.steps],
+            ):
+                res.result = await onboarding.run(data.steps)
+                failed_steps = [step for step, result in res.result.items() if result['status'] != 'completed']
+                if failed_steps:
+                    raise ProjectOnboardingError(failed_steps)
+        except ProjectOnboardingError as e:
+            res.error_msg = str(e)
+            res.code = EAPIResponseCode.internal_error
+            res.total = 0
+
+        durations = {step: result['duration_ms'] for step, result in res.result.items()}
+        logger.info(f'Onboarded project {data.project_code} with step durations {durations}')
+        return res.json_response()
+
+
+@cbv.cbv(router)
+class RoleClone:
+    identity_crud: IdentityCRUD = Depends(get_identity_crud)
+
+    @router.post('/admin/roles/clone', tags=[_API_TAG], summary='clone project role with its permissions')
+    @catch_internal(_API_NAMESPACE)
+    async def post(self, data: RoleClonePOST):
+        """
+        Summary:
+            The api is used to create a new custom project role with
+            the same permissions as an existing one. The keycloak realm
+            role `<project_code>-<new_role>` is created and the role record
+            is stored along with copies of the source role casbin rules.
+
+        Payload:
+            - project_code(string): the unique code of project.
+            - source_role(string): the role to copy permissions from.
+            - new_role(string): the name of the new role.
+
+        Return:
+            - 200 number of copied rules
+        """
+
+        res = APIResponse()
+        if not data.new_role or not re.fullmatch(ConfigSettings.ROLE_NAME_REGEX, data.new_role):
+            res.error_msg = f'Invalid role name {data.new_role}'
+            res.code = EAPIResponseCode.bad_request
+            return res.json_response()
+
+        with AuditLog(
+            'clone project role', project_code=data.project_code, source_role=data.source_role, new_role=data.new_role
+        ):
+            await run_in_threadpool(validate_role_clone, data.source_role, data.new_role, data.project_code)
+            operations_admin = await self.identity_crud.create_operations_admin()
+            await operations_admin.create_project_realm_roles([data.new_role], data.project_code, exist_ok=True)
+            copied = await run_in_threadpool(clone_role, data.source_role, data.new_role, data.project_code)
+
+        res.result = 'success'
+        res.total = copied
+        return res.json_response()
+
+
 @cbv.cbv(router)
 class UserInRole:
     @router.post('/admin/roles/users', tags=[_API_TAG], summary='')
@@ -4,16 +4,73 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
+import time as tm
+from collections import Counter
+from collections import OrderedDict
 from pathlib import Path
+from typing import Protocol
 
 from casbin import Enforcer
+from casbin import persist
+from casbin.config import Config
 from casbin_sqlalchemy_adapter import Adapter as CasbinAdapter
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Query
 
+from app.commons.policy_cache import PolicyVersion
+from app.commons.policy_cache import PolicyVersions
+from app.models.permissions import DEFAULT_PROJECT_CODE
 from app.models.permissions import CasbinRule
+from app.models.permissions import PolicyInheritanceModel
+from app.routers.permissions.compiled_policy import CompiledPolicy
+from app.routers.permissions.compiled_policy import get_unconditional_subjects
+
+
+class PolicyEnforcer(Protocol):
+    """Loaded project policy able to decide on requests."""
+
+    def enforce(self, *rvals: str) -> bool:
+        """Return whether policy allows request made of rvals."""
+
+
+class LayeredPolicy:
+    """Project policy layered over the shared policy of the default project it inherits.
+
+    Request is allowed when either the project policy or the default policy allows it, which gives the same decisions
+    as the project policy with copies of default rules added. Default policy is evaluated for the default project code
+    and only for requests of the project.
+    """
+
+    def __init__(self, project_code: str, policy: PolicyEnforcer | None, default_policy: PolicyEnforcer) -> None:
+        self.project_code = project_code
+        self.policy = policy
+        self.default_policy = default_policy
+
+    def enforce(self, subject: str, domain: str, obj: str, action: str, project_code: str) -> bool:
+        """Decide whether subject can perform action on object in domain of the project."""
+
+        if project_code == self.project_code and self.default_policy.enforce(
+            subject, domain, obj, action, DEFAULT_PROJECT_CODE
+        ):
+            return True
+
+        return self.policy is not None and self.policy.enforce(subject, domain, obj, action, project_code)
+
+
+def has_policy(enforcer: PolicyEnforcer) -> bool:
+    """Check if any policy line is loaded into enforcer."""
+
+    if isinstance(enforcer, LayeredPolicy):
+        return True
+    if isinstance(enforcer, CompiledPolicy):
+        return enforcer.size > 0
+    return bool(enforcer.get_policy() or enforcer.get_grouping_policy())
 
 
 class Filtering(BaseModel):
@@ -23,12 +80,18 @@ class Filtering(BaseModel):
 
 
 class Adapter(CasbinAdapter):
-    """Adapter with custom filtering for enforcer."""
+    """Adapter with custom filtering for enforcer.
 
-    def __init__(self, engine: Engine) -> None:
+    When async engine is provided project policies are loaded with it on the event loop instead of in the threadpool.
+    """
+
+    def __init__(self, engine: Engine, async_engine: AsyncEngine | None = None) -> None:
         super().__init__(engine=engine, db_class=CasbinRule, filtered=True)
 
+        self.async_engine = async_engine
+
         self.model_path = str(Path(__file__).parent / 'model.conf')
+        self.unconditional_subjects = get_unconditional_subjects(Config.new_config(self.model_path).get('matchers::m'))
 
     def filter_query(self, query: Query, filtering: Filtering) -> Query:
         """Filter rules that belong to project."""
@@ -39,8 +102,316 @@ class Adapter(CasbinAdapter):
     async def get_enforcer_for_project(self, project_code: str) -> Enforcer:
         """Create enforcer and load policies for project."""
 
+        if self.async_engine is not None:
+            return self.create_enforcer(await self.fetch_policy_lines(project_code))
+
         enforcer = Enforcer(model=self.model_path, adapter=self)
         filtering = Filtering(project_code=project_code)
         await run_in_threadpool(enforcer.load_filtered_policy, filtering)
 
         return enforcer
+
+    def create_enforcer(self, lines: list[str]) -> Enforcer:
+        """Create enforcer with policy lines loaded."""
+
+        enforcer = Enforcer(model=self.model_path)
+        for line in lines:
+            persist.load_policy_line(line, enforcer.get_model())
+        enforcer.build_role_links()
+
+        return enforcer
+
+    def load_policy_lines(self, filtering: Filtering) -> list[str]:
+        """Load rules that belong to project as policy lines in the format enforcer reads them."""
+
+        with self._session_scope() as session:
+            query = self.filter_query(session.query(self._db_class), filtering)
+            return [str(rule) for rule in query.all()]
+
+    def inherits_default_policy(self, project_code: str) -> bool:
+        """Check if project inherits rules of the default project."""
+
+        with self._session_scope() as session:
+            return session.query(PolicyInheritanceModel).get(project_code) is not None
+
+    async def fetch_policy_lines(self, project_code: str) -> list[str]:
+        """Load rules that belong to project as policy lines without blocking the event loop."""
+
+        filtering = Filtering(project_code=project_code)
+        if self.async_engine is None:
+            return await run_in_threadpool(self.load_policy_lines, filtering)
+
+        async with AsyncSession(self.async_engine) as session:
+            result = await session.execute(self.filter_query(select(self._db_class), filtering))
+            return [str(rule) for rule in result.scalars()]
+
+    async def fetch_default_policy_inheritance(self, project_code: str) -> bool:
+        """Check if project inherits rules of the default project without blocking the event loop."""
+
+        if self.async_engine is None:
+            return await run_in_threadpool(self.inherits_default_policy, project_code)
+
+        async with AsyncSession(self.async_engine) as session:
+            return await session.get(PolicyInheritanceModel, project_code) is not None
+
+    async def get_compiled_policy_for_project(self, project_code: str) -> PolicyEnforcer:
+        """Load policies for project and compile them.
+
+        Enforcer is returned instead when project rules do not have the shape the compiled policy supports.
+        """
+
+        lines = await self.fetch_policy_lines(project_code)
+
+        tokens = [line.split(', ') for line in lines]
+        if all(line_tokens[0] == 'p' for line_tokens in tokens):
+            policy = [line_tokens[1:] for line_tokens in tokens]
+            if CompiledPolicy.is_compilable(policy):
+                return CompiledPolicy(policy, self.unconditional_subjects)
+
+        return self.create_enforcer(lines)
+
+
+class DecisionCache:
+    """Bounded LRU cache of authorization decisions.
+
+    Decisions are keyed by the request and the policy version it was decided with, so decisions of outdated policies
+    are never returned and age out of the cache. Projects without any rules are cached separately, every request for
+    them is denied.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+        self.stats = Counter()
+        self._decisions: OrderedDict[tuple[tuple[str, ...], tuple[PolicyVersion, ...]], tuple[float, bool]] = (
+            OrderedDict()
+        )
+        self._empty_projects: OrderedDict[tuple[str, tuple[PolicyVersion, ...]], float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._decisions)
+
+    def get(self, request: tuple[str, ...], version: tuple[PolicyVersion, ...], ttl: int) -> bool | None:
+        """Return cached decision for request that is not older than ttl seconds."""
+
+        now = tm.monotonic()
+        project_code = request[-1]
+
+        decided_at = self._empty_projects.get((project_code, version))
+        if decided_at is not None and now < decided_at + ttl:
+            self.stats['negative_hits'] += 1
+            return False
+
+        key = (request, version)
+        try:
+            decided_at, decision = self._decisions[key]
+        except KeyError:
+            self.stats['misses'] += 1
+            return None
+
+        if now >= decided_at + ttl:
+            del self._decisions[key]
+            self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return None
+
+        self._decisions.move_to_end(key)
+        self.stats['hits'] += 1
+        return decision
+
+    def store(self, request: tuple[str, ...], version: tuple[PolicyVersion, ...], decision: bool) -> None:
+        """Add decision evicting the least recently used ones above the size limit."""
+
+        self._store(self._decisions, (request, version), (tm.monotonic(), decision))
+
+    def store_empty_project(self, project_code: str, version: tuple[PolicyVersion, ...]) -> None:
+        """Remember that project has no rules in the policy version."""
+
+        self._store(self._empty_projects, (project_code, version), tm.monotonic())
+
+    def _store(self, entries: OrderedDict, key: tuple, value: object) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+
+        while len(entries) > self.size:
+            entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def clear(self) -> None:
+        """Remove all cached decisions."""
+
+        self._decisions.clear()
+        self._empty_projects.clear()
+
+
+class EnforcerPool:
+    """Bounded LRU pool of enforcers with loaded project policies.
+
+    Project policies are compiled into hash indexes when compiled is set, otherwise Casbin enforcers are used. Entries
+    expire after ttl seconds or as soon as the project policy version changes. While policy versions are not
+    synchronized with other workers the shorter fallback ttl is applied instead. Concurrent requests for the same
+    missing project share a single policy load.
+
+    Policies of projects inheriting the default project are layered over the pooled default project policy, so the
+    default policy is loaded once and shared by all of them. Any change of the default project policy invalidates all
+    pooled enforcers.
+
+    Requests decided with enforce() of subjects the model allows everything to unconditionally are answered without
+    loading any policy. Other decisions are cached when decision cache size is set, with the same expiration as
+    enforcers.
+    """
+
+    def __init__(
+        self,
+        adapter: Adapter,
+        size: int,
+        ttl: int,
+        versions: PolicyVersions,
+        fallback_ttl: int | None = None,
+        compiled: bool = False,
+        decision_cache_size: int = 0,
+    ) -> None:
+        self.adapter = adapter
+        self.compiled = compiled
+        self.size = size
+        self.ttl = ttl
+        self.fallback_ttl = ttl if fallback_ttl is None else min(ttl, fallback_ttl)
+        self.versions = versions
+
+        self.decisions = DecisionCache(decision_cache_size) if decision_cache_size > 0 else None
+
+        self.stats = Counter()
+        self._enforcers: OrderedDict[str, tuple[float, tuple[PolicyVersion, ...], PolicyEnforcer]] = OrderedDict()
+        self._loading: dict[tuple[str, tuple[PolicyVersion, ...]], asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._enforcers)
+
+    def allows_unconditionally(self, subject: str) -> bool:
+        """Check if the model allows everything to subject regardless of the project policy."""
+
+        if subject in self.adapter.unconditional_subjects:
+            self.stats['short_circuits'] += 1
+            return True
+
+        return False
+
+    def _get_version(self, project_code: str) -> tuple[PolicyVersion, ...]:
+        """Return versions of project policy and of default project policy it may inherit."""
+
+        return self.versions.get(project_code), self.versions.get(DEFAULT_PROJECT_CODE)
+
+    def _get_ttl(self) -> int:
+        """Return expiration time depending on whether policy versions are synchronized."""
+
+        return self.ttl if self.versions.synchronized else self.fallback_ttl
+
+    def _lookup(self, project_code: str) -> PolicyEnforcer | None:
+        """Return pooled enforcer if it is present, not expired and built from the current policy version."""
+
+        try:
+            loaded_at, version, enforcer = self._enforcers[project_code]
+        except KeyError:
+            return None
+
+        if version != self._get_version(project_code):
+            del self._enforcers[project_code]
+            self.stats['invalidations'] += 1
+            return None
+
+        if tm.monotonic() >= loaded_at + self._get_ttl():
+            del self._enforcers[project_code]
+            self.stats['expirations'] += 1
+            return None
+
+        self._enforcers.move_to_end(project_code)
+        return enforcer
+
+    def _store(self, project_code: str, version: tuple[PolicyVersion, ...], enforcer: PolicyEnforcer) -> None:
+        """Add enforcer to the pool evicting the least recently used ones above the size limit."""
+
+        self._enforcers[project_code] = (tm.monotonic(), version, enforcer)
+        self._enforcers.move_to_end(project_code)
+
+        while len(self._enforcers) > self.size:
+            self._enforcers.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    async def _load_project(self, project_code: str) -> PolicyEnforcer:
+        if self.compiled:
+            return await self.adapter.get_compiled_policy_for_project(project_code)
+        return await self.adapter.get_enforcer_for_project(project_code)
+
+    async def _load(self, project_code: str, version: tuple[PolicyVersion, ...]) -> PolicyEnforcer:
+        # Version is captured before loading, so a change committed during the load leaves a stale entry behind.
+        if project_code == DEFAULT_PROJECT_CODE:
+            enforcer = await self._load_project(project_code)
+        else:
+            enforcer, inherits = await asyncio.gather(
+                self._load_project(project_code),
+                self.adapter.fetch_default_policy_inheritance(project_code),
+            )
+            if inherits:
+                default_policy = await self.get(DEFAULT_PROJECT_CODE)
+                enforcer = LayeredPolicy(project_code, enforcer if has_policy(enforcer) else None, default_policy)
+
+        self.stats['loads'] += 1
+        self._store(project_code, version, enforcer)
+        return enforcer
+
+    async def get(self, project_code: str) -> PolicyEnforcer:
+        """Return enforcer for project loading its policies on a pool miss."""
+
+        enforcer = self._lookup(project_code)
+        if enforcer is not None:
+            self.stats['hits'] += 1
+            return enforcer
+
+        self.stats['misses'] += 1
+
+        key = (project_code, self._get_version(project_code))
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(*key))
+            self._loading[key] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(key, None))
+
+        return await asyncio.shield(loading)
+
+    async def enforce(self, subject: str, domain: str, obj: str, action: str, project_code: str) -> bool:
+        """Decide whether subject can perform action on object in domain of the project."""
+
+        if self.allows_unconditionally(subject):
+            return True
+
+        request = (subject, domain, obj, action, project_code)
+        if self.decisions is None:
+            enforcer = await self.get(project_code)
+            return enforcer.enforce(*request)
+
+        version = self._get_version(project_code)
+        decision = self.decisions.get(request, version, self._get_ttl())
+        if decision is not None:
+            return decision
+
+        enforcer = await self.get(project_code)
+        decision = enforcer.enforce(*request)
+        self.decisions.store(request, version, decision)
+        # Casbin allows requests with empty values against empty policy, so empty project code is never denied outright.
+        if project_code and not has_policy(enforcer):
+            self.decisions.store_empty_project(project_code, version)
+
+        return decision
+
+    def evict(self, project_code: str) -> None:
+        """Remove project enforcer from the pool."""
+
+        if self._enforcers.pop(project_code, None) is not None:
+            self.stats['evictions'] += 1
+
+    def clear(self) -> None:
+        """Remove all enforcers and cached decisions from the pool."""
+
+        self._enforcers.clear()
+        if self.decisions is not None:
+            self.decisions.clear()
@@ -0,0 +1,148 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import re
+from collections.abc import Iterable
+
+PLATFORM_ADMIN = 'platform_admin'
+WILDCARD = '*'
+
+PolicyLine = list[str]
+
+SUBJECT_EQUALS_LITERAL = re.compile(r'^r\.sub\s*==\s*(?:\'([^\']*)\'|"([^"]*)")$')
+
+
+def _split_top_level(expression: str, operator: str) -> list[str]:
+    """Split matcher expression by operator occurrences outside of parentheses and string literals."""
+
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    position = 0
+    while position < len(expression):
+        char = expression[position]
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in ('\'', '"'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and expression.startswith(operator, position):
+            parts.append(expression[start:position])
+            position += len(operator)
+            start = position
+            continue
+        position += 1
+
+    parts.append(expression[start:])
+    return [part.strip() for part in parts]
+
+
+def _is_balanced(expression: str) -> bool:
+    """Check if parentheses of expression are balanced without closing any unopened one."""
+
+    depth = 0
+    quote = None
+    for char in expression:
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in ('\'', '"'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def _strip_parentheses(expression: str) -> str:
+    """Remove parentheses enclosing the whole expression."""
+
+    while expression.startswith('(') and expression.endswith(')'):
+        inner = expression[1:-1].strip()
+        if not _is_balanced(inner):
+            break
+        expression = inner
+    return expression
+
+
+def get_unconditional_subjects(matcher: str) -> frozenset[str]:
+    """Return subjects the matcher allows everything to regardless of the policy.
+
+    These are subjects compared to a literal in a top level alternative of the matcher, such as
+    `... || r.sub == 'platform_admin'`.
+    """
+
+    subjects = set()
+    for alternative in _split_top_level(_strip_parentheses(matcher.strip()), '||'):
+        match = SUBJECT_EQUALS_LITERAL.match(_strip_parentheses(alternative))
+        if match:
+            subjects.add(match.group(1) if match.group(1) is not None else match.group(2))
+
+    return frozenset(subjects)
+
+
+class CompiledPolicy:
+    """Project policy compiled into a hash index giving the same decisions as the model.conf matcher.
+
+    Policy lines are indexed by (subject, object, project code). Each index entry maps policy domains to allowed
+    actions with actions of the '*' policy domain merged into every domain, so enforcing a request takes a couple of
+    dictionary probes instead of evaluating the matcher against every policy line.
+    """
+
+    def __init__(
+        self, policy: Iterable[PolicyLine], unconditional_subjects: frozenset[str] = frozenset({PLATFORM_ADMIN})
+    ) -> None:
+        self.unconditional_subjects = unconditional_subjects
+
+        policy = list(policy)
+        self.size = len(policy)
+        if not policy:
+            # Casbin evaluates the matcher once against empty policy values when there is no policy at all.
+            policy = [['', '', '', '', '']]
+
+        domains_by_key: dict[tuple[str, str, str], dict[str, set[str]]] = {}
+        for subject, domain, obj, action, project_code in policy:
+            domains = domains_by_key.setdefault((subject, obj, project_code), {})
+            domains.setdefault(domain, set()).add(action)
+
+        self._index: dict[tuple[str, str, str], tuple[dict[str, frozenset[str]], frozenset[str], frozenset[str]]] = {}
+        for key, domains in domains_by_key.items():
+            wildcard_actions = frozenset(domains.get(WILDCARD, ()))
+            actions_by_domain = {domain: wildcard_actions.union(actions) for domain, actions in domains.items()}
+            any_domain_actions = frozenset().union(*domains.values())
+            self._index[key] = (actions_by_domain, wildcard_actions, any_domain_actions)
+
+    @classmethod
+    def is_compilable(cls, policy: Iterable[PolicyLine]) -> bool:
+        """Check if policy lines have the shape defined by the model policy definition."""
+
+        return all(len(line) == 5 for line in policy)
+
+    def enforce(self, subject: str, domain: str, obj: str, action: str, project_code: str) -> bool:
+        """Decide whether subject can perform action on object in domain of the project."""
+
+        if subject in self.unconditional_subjects:
+            return True
+
+        try:
+            actions_by_domain, wildcard_actions, any_domain_actions = self._index[subject, obj, project_code]
+        except KeyError:
+            return False
+
+        if domain == WILDCARD:
+            actions = any_domain_actions
+        else:
+            actions = actions_by_domain.get(domain, wildcard_actions)
+
+        return action in actions or WILDCARD in actions
@@ -5,14 +5,13 @@
 # You may not use this file except in compliance with the License.
 
 from fastapi import APIRouter
-from fastapi_sqlalchemy import db
 from fastapi_utils import cbv
 
+from app.commons.default_roles import provision_default_policy
 from app.logger import logger
 from app.models.api_response import APIResponse
 from app.models.api_response import EAPIResponseCode
 from app.models.default_roles import CreateDefaultRoles
-from app.models.permissions import CasbinRule
 
 _engine = None
 
@@ -28,25 +27,14 @@ class DefaultRoles:
     def post(self, data: CreateDefaultRoles):
         api_response = APIResponse()
         try:
-            default_rules = db.session.query(CasbinRule).filter(CasbinRule.v4 == 'pilotdefault')
-            for rule in default_rules:
-                new_rule = {
-                    'ptype': 'p',
-                    'v0': rule.v0,
-                    'v1': rule.v1,
-                    'v2': rule.v2,
-                    'v3': rule.v3,
-                    'v4': data.project_code,
-                }
-                new_rule = CasbinRule(**new_rule)
-                db.session.add(new_rule)
-                db.session.commit()
+            created = provision_default_policy(data.project_code)
         except Exception as e:
             error_msg = f'Error creating default roles for {data.project_code}: {str(e)}'
             logger.error(error_msg)
             api_response.error_msg = error_msg
             api_response.code = EAPIResponseCode.internal_error.value
             return api_response.json_response()
-        logger.info(f'Created roles for {data.project_code}')
+        logger.info(f'Created roles for {data.project_code} with {created} copied rules')
+        api_response.total = created
         api_response.result = 'success'
         return api_response.json_response()
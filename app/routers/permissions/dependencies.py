@@ -6,11 +6,21 @@
 
 from fastapi import Depends
 from fastapi.concurrency import run_in_threadpool
+from fastapi_sqlalchemy import db
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from app import get_settings
+from app.commons.permission_catalogue import PermissionCatalogueCache
+from app.commons.policy_cache import policy_versions
+from app.commons.policy_cache.matrix import ProjectMatrixCache
+from app.commons.psql_services.permissions import get_migration_version
+from app.commons.psql_services.permissions import get_permission_catalogue
 from app.config import Settings
+from app.logger import logger
 from app.routers.permissions.casbin import Adapter
+from app.routers.permissions.casbin import EnforcerPool
 
 
 class GetCasbinAdapter:
@@ -24,9 +34,111 @@ class GetCasbinAdapter:
 
         if not self.instance:
             engine = create_engine(settings.RDS_DB_URI, pool_pre_ping=settings.RDS_PRE_PING)
-            self.instance = await run_in_threadpool(Adapter, engine=engine)
+            async_engine = None
+            if settings.CASBIN_ASYNC_POLICY_LOADER_ENABLED:
+                async_engine = create_async_engine(
+                    make_url(settings.RDS_DB_URI).set(drivername='postgresql+asyncpg'),
+                    pool_size=settings.CASBIN_ASYNC_POLICY_LOADER_POOL_SIZE,
+                    max_overflow=settings.CASBIN_ASYNC_POLICY_LOADER_MAX_OVERFLOW,
+                    pool_pre_ping=settings.RDS_PRE_PING,
+                )
+            self.instance = await run_in_threadpool(Adapter, engine=engine, async_engine=async_engine)
 
         return self.instance
 
+    async def close(self) -> None:
+        """Close database connections of the instance."""
+
+        if self.instance and self.instance.async_engine is not None:
+            await self.instance.async_engine.dispose()
+
 
 get_casbin_adapter = GetCasbinAdapter()
+
+
+class GetEnforcerPool:
+    """Create a FastAPI callable dependency for EnforcerPool single instance."""
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def __call__(
+        self, settings: Settings = Depends(get_settings), adapter: Adapter = Depends(get_casbin_adapter)
+    ) -> EnforcerPool:
+        """Return an instance of EnforcerPool class."""
+
+        if not self.instance:
+            self.instance = EnforcerPool(
+                adapter,
+                size=settings.CASBIN_ENFORCER_POOL_SIZE,
+                ttl=settings.CASBIN_ENFORCER_POOL_TTL,
+                versions=policy_versions,
+                fallback_ttl=settings.CASBIN_ENFORCER_POOL_FALLBACK_TTL,
+                compiled=settings.CASBIN_COMPILED_POLICY_ENABLED,
+                decision_cache_size=settings.CASBIN_DECISION_CACHE_SIZE,
+            )
+
+        return self.instance
+
+
+get_enforcer_pool = GetEnforcerPool()
+
+
+class GetProjectMatrixCache:
+    """Create a FastAPI callable dependency for ProjectMatrixCache single instance."""
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def __call__(self, settings: Settings = Depends(get_settings)) -> ProjectMatrixCache:
+        """Return an instance of ProjectMatrixCache class."""
+
+        if not self.instance:
+            self.instance = ProjectMatrixCache(
+                policy_versions,
+                size=settings.PERMISSION_MATRIX_CACHE_SIZE,
+                ttl=settings.CASBIN_ENFORCER_POOL_TTL,
+                fallback_ttl=settings.CASBIN_ENFORCER_POOL_FALLBACK_TTL,
+            )
+
+        return self.instance
+
+
+get_project_matrix_cache = GetProjectMatrixCache()
+
+
+class GetPermissionCatalogueCache:
+    """Create a FastAPI callable dependency for PermissionCatalogueCache single instance."""
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def __call__(self, settings: Settings = Depends(get_settings)) -> PermissionCatalogueCache:
+        """Return an instance of PermissionCatalogueCache class."""
+
+        if not self.instance:
+            self.instance = PermissionCatalogueCache(
+                get_permission_catalogue,
+                get_migration_version,
+                check_interval=settings.PERMISSION_CATALOGUE_CHECK_INTERVAL,
+                versions=policy_versions,
+            )
+
+        return self.instance
+
+    async def preload(self) -> None:
+        """Load the catalogue before the first request, leaving it to be loaded on demand if that fails."""
+
+        catalogue_cache = await self(get_settings())
+
+        def load() -> None:
+            with db():
+                catalogue_cache.get()
+
+        try:
+            await run_in_threadpool(load)
+        except Exception as e:
+            logger.error(f'Failed to preload permissions metadata catalogue: {e}')
+
+
+get_permission_catalogue_cache = GetPermissionCatalogueCache()
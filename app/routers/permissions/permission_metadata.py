@@ -5,21 +5,32 @@
 # You may not use this file except in compliance with the License.
 
 import math
+from functools import partial
 
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
+from fastapi import Response
 from fastapi.concurrency import run_in_threadpool
 from fastapi_utils.cbv import cbv
 
-from app.commons.psql_services.permissions import get_casbin_rules
-from app.commons.psql_services.permissions import list_permissions
-from app.commons.psql_services.permissions import list_roles
+from app.commons.permission_catalogue import PermissionCatalogueCache
+from app.commons.policy_cache.matrix import ProjectMatrixCache
+from app.commons.policy_cache.matrix import etag_matches
+from app.commons.psql_services.permissions import get_project_matrix
+from app.commons.psql_services.permissions import sync_casbin_rules
+from app.logger import logger
+from app.models.api_response import APIResponse
 from app.models.api_response import EAPIResponseCode
 from app.models.permissions_schema import ListPermissions
 from app.models.permissions_schema import ListPermissionsResponse
 from app.models.permissions_schema import ListRoles
 from app.models.permissions_schema import ListRolesResponse
+from app.models.permissions_schema import SyncPermissions
+from app.models.permissions_schema import SyncPermissionsResponse
 from app.resources.error_handler import APIException
+from app.routers.permissions.dependencies import get_permission_catalogue_cache
+from app.routers.permissions.dependencies import get_project_matrix_cache
 
 router = APIRouter()
 
@@ -36,34 +47,70 @@ class PermissionMetadata:
         summary='List permission metadata',
         tags=[_API_TAG],
     )
-    async def get(self, data: ListPermissions = Depends(ListPermissions)):
-        """List permission metadata."""
+    async def get(
+        self,
+        data: ListPermissions = Depends(ListPermissions),
+        if_none_match: str | None = Header(None),
+        matrix_cache: ProjectMatrixCache = Depends(get_project_matrix_cache),
+        catalogue_cache: PermissionCatalogueCache = Depends(get_permission_catalogue_cache),
+    ):
+        """List permission metadata.
+
+        Permissions are served from the in-memory catalogue. Response carries an etag of the project matrix and
+        responds with 304 when the client has it already.
+        """
         api_response = ListPermissionsResponse()
 
         try:
-            permissions, count = await run_in_threadpool(list_permissions, data)
+            catalogue = await run_in_threadpool(catalogue_cache.get)
+            permissions = catalogue.list_permissions(data.order_by, data.order_type, data.page, data.page_size)
         except Exception as e:
             raise APIException(
                 error_msg=f'Failed to query permissions metadata: {e}',
                 status_code=EAPIResponseCode.internal_error.value,
             )
 
-        results = []
+        build_matrix = partial(get_project_matrix, catalogue=catalogue)
+        matrix = await run_in_threadpool(matrix_cache.get, data.project_code, build_matrix, catalogue.revision)
+
+        etag = matrix.get_etag('metadata', data.json())
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={'ETag': etag})
+
         for permission in permissions:
-            permission_data = permission.to_dict()
-            permission_data['permissions'] = await run_in_threadpool(
-                get_casbin_rules,
-                resource=permission.resource,
-                operation=permission.operation,
-                zone=permission.zone,
-                project_code=data.project_code,
-            )
-            permission_data['project_code'] = data.project_code
-            results.append(permission_data)
-        api_response.result = results
+            try:
+                permission['permissions'] = matrix.permissions[permission['id']]
+            except KeyError:
+                logger.error(f'Permission {permission["id"]} is missing in permission matrix of {data.project_code}')
+                permission['permissions'] = {}
+            permission['project_code'] = data.project_code
+        api_response.result = permissions
         api_response.page = data.page
-        api_response.num_of_pages = math.ceil(count / data.page_size)
-        api_response.total = count
+        api_response.num_of_pages = math.ceil(catalogue.total / data.page_size)
+        api_response.total = catalogue.total
+        response = api_response.json_response()
+        response.headers['ETag'] = etag
+        return response
+
+    @router.post(
+        '/permissions/metadata/reload',
+        summary='Reload permission metadata catalogue',
+        tags=[_API_TAG],
+    )
+    async def reload(self, catalogue_cache: PermissionCatalogueCache = Depends(get_permission_catalogue_cache)):
+        """Reload permission metadata catalogue of all workers."""
+        api_response = APIResponse()
+
+        try:
+            catalogue = await run_in_threadpool(catalogue_cache.reload)
+        except Exception as e:
+            raise APIException(
+                error_msg=f'Failed to reload permissions metadata: {e}',
+                status_code=EAPIResponseCode.internal_error.value,
+            )
+
+        api_response.result = {'migration_version': catalogue.migration_version, 'revision': catalogue.revision}
+        api_response.total = catalogue.total
         return api_response.json_response()
 
     @router.get(
@@ -71,14 +118,47 @@ class PermissionMetadata:
         summary='list roles in project',
         tags=[_API_TAG],
     )
-    async def get_list_roles(self, data: ListRoles = Depends(ListRoles)):
+    async def get_list_roles(
+        self,
+        data: ListRoles = Depends(ListRoles),
+        if_none_match: str | None = Header(None),
+        matrix_cache: ProjectMatrixCache = Depends(get_project_matrix_cache),
+        catalogue_cache: PermissionCatalogueCache = Depends(get_permission_catalogue_cache),
+    ):
         """List project roles."""
         api_response = ListRolesResponse()
-        roles = await run_in_threadpool(
-            list_roles,
-            data.project_code,
-            data.order_by,
-            data.order_type,
-        )
-        api_response.result = roles
+
+        catalogue = await run_in_threadpool(catalogue_cache.get)
+        build_matrix = partial(get_project_matrix, catalogue=catalogue)
+        matrix = await run_in_threadpool(matrix_cache.get, data.project_code, build_matrix, catalogue.revision)
+        etag = matrix.get_etag('roles', data.json())
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={'ETag': etag})
+
+        api_response.result = matrix.list_roles(data.order_by, data.order_type)
+        response = api_response.json_response()
+        response.headers['ETag'] = etag
+        return response
+
+
+@cbv(router)
+class ProjectPermissions:
+    """Project permissions view."""
+
+    @router.put(
+        '/permissions',
+        response_model=SyncPermissionsResponse,
+        summary='Sync permissions of project roles',
+        tags=[_API_TAG],
+    )
+    async def put(self, data: SyncPermissions):
+        """Make permissions of project roles match the given mapping of roles to permission metadata ids.
+
+        Only the difference against the current casbin rules is applied, in a single transaction. Roles missing in the
+        mapping are left intact.
+        """
+        api_response = SyncPermissionsResponse()
+
+        api_response.result = await run_in_threadpool(sync_casbin_rules, data.rules, data.project_code)
+        logger.info(f'Synced permissions of {data.project_code}: {api_response.result}')
         return api_response.json_response()
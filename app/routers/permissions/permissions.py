@@ -4,6 +4,8 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
+
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi_utils import cbv
@@ -11,9 +13,11 @@ from fastapi_utils import cbv
 from app.logger import logger
 from app.models.api_response import APIResponse
 from app.models.api_response import EAPIResponseCode
+from app.models.permissions_schema import AuthorizeBatch
+from app.models.permissions_schema import AuthorizeBatchResponse
 from app.resources.error_handler import catch_internal
-from app.routers.permissions.casbin import Adapter
-from app.routers.permissions.dependencies import get_casbin_adapter
+from app.routers.permissions.casbin import EnforcerPool
+from app.routers.permissions.dependencies import get_enforcer_pool
 
 router = APIRouter()
 
@@ -32,7 +36,7 @@ class Authorize:
         resource: str,
         operation: str,
         project_code: str = 'pilotdefault',
-        adapter: Adapter = Depends(get_casbin_adapter),
+        enforcer_pool: EnforcerPool = Depends(get_enforcer_pool),
     ):
         api_response = APIResponse()
 
@@ -41,8 +45,7 @@ class Authorize:
 
         api_response.result = {'has_permission': False}
         try:
-            enforcer = await adapter.get_enforcer_for_project(project_code)
-            if enforcer.enforce(role, zone, resource, operation, project_code):
+            if await enforcer_pool.enforce(role, zone, resource, operation, project_code):
                 api_response.result = {'has_permission': True}
                 api_response.code = EAPIResponseCode.success
                 logger.info(f'Access granted for {role}, {zone}, {resource}, {operation}, {project_code}')
@@ -55,3 +58,39 @@ class Authorize:
             api_response.code = EAPIResponseCode.internal_error
 
         return api_response.json_response()
+
+    @router.post(
+        '/authorize/batch',
+        tags=[_API_TAG],
+        response_model=AuthorizeBatchResponse,
+        summary='check the authorization for a batch of requests',
+    )
+    @catch_internal(_API_NAMESPACE)
+    async def post(self, data: AuthorizeBatch, enforcer_pool: EnforcerPool = Depends(get_enforcer_pool)):
+        """Check authorization for every request in the batch and return decisions in the same order.
+
+        Policies are loaded once per distinct project code and only for projects with checks of subjects that are not
+        allowed everything unconditionally.
+        """
+
+        api_response = AuthorizeBatchResponse()
+
+        try:
+            decisions = await asyncio.gather(
+                *[
+                    enforcer_pool.enforce(check.role, check.zone, check.resource, check.operation, check.project_code)
+                    for check in data.checks
+                ]
+            )
+            api_response.result = [{'has_permission': has_permission} for has_permission in decisions]
+            project_codes = {check.project_code for check in data.checks}
+            logger.info(
+                f'Access granted for {sum(decisions)} of {len(decisions)} checks in {len(project_codes)} projects'
+            )
+        except Exception as e:
+            error_msg = f'Error checking permissions - {str(e)}'
+            logger.error(error_msg)
+            api_response.error_msg = error_msg
+            api_response.code = EAPIResponseCode.internal_error
+
+        return api_response.json_response()
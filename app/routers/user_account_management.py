@@ -223,7 +223,7 @@ class UserManagementV1:
                 realm_role = await identity_crud.get_user_realm_roles(user_id)
                 deleted_roles = [x for x in realm_role if x.get('name') != 'uma_authorization']
                 await kc_cli.remove_user_realm_roles(user_id, deleted_roles)
-                await kc_cli.keycloak_admin.update_user(user_id, payload={'enabled': False})
+                await kc_cli.set_user_enabled(user_id, False)
 
                 IdentityClient = get_identity_client()
                 async with IdentityClient() as client:
@@ -234,7 +234,7 @@ class UserManagementV1:
                             if group_name.startswith(ConfigSettings.LDAP_PREFIX):
                                 await client.remove_user_from_group(identity_user['email'], group_name)
             else:
-                await kc_cli.keycloak_admin.update_user(user_id, payload={'enabled': True})
+                await kc_cli.set_user_enabled(user_id, True)
 
             if operation_type == 'disable':
                 event_type = 'ACCOUNT_DISABLE'
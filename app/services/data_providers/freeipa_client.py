@@ -141,12 +141,16 @@ class FreeIPAClient:
             'hbac_rules': user['result'][0].get('memberof_hbacrule', []),
         }
 
-    async def create_group(self, group_name: str, description: str = '') -> str:
-        await run_in_threadpool(
-            self.client.group_add,
-            a_cn=group_name,
-            o_description=description,
-        )
+    async def create_group(self, group_name: str, description: str = '', exist_ok: bool = False) -> str:
+        try:
+            await run_in_threadpool(
+                self.client.group_add,
+                a_cn=group_name,
+                o_description=description,
+            )
+        except DuplicateEntry:
+            if not exist_ok:
+                raise
 
     async def delete_group(self, group_name: str) -> str:
         await run_in_threadpool(
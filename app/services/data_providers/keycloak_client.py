@@ -107,10 +107,10 @@ class KeycloakClient:
         await self.client.group_user_remove(user_id=user['id'], group_id=group['id'])
         return 'success'
 
-    async def create_group(self, group_name: str, description: str = '') -> str:
+    async def create_group(self, group_name: str, description: str = '', exist_ok: bool = False) -> str:
         """Create a group with given name."""
         group = await self.client.create_group(payload={'name': group_name}, skip_exists=True)
-        if group:
+        if group or exist_ok:
             return group
         else:
             error_msg = f'Could not create a group {group_name}'
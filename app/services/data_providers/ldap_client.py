@@ -7,6 +7,7 @@
 import ldap
 import ldap.modlist as modlist
 import yaml
+from fastapi.concurrency import run_in_threadpool
 
 from app.commons.psql_services.ldap_id import create_ldap_id
 from app.config import ConfigSettings
@@ -58,11 +59,11 @@ class LdapClient:
         self.conn.unbind_s()
 
     async def __aenter__(self) -> 'LdapClient':
-        self.connect()
+        await run_in_threadpool(self.connect)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        self.disconnect()
+        await run_in_threadpool(self.disconnect)
 
     def format_group_dn(self, group_name: str) -> str:
         """
@@ -219,8 +220,15 @@ class LdapClient:
             return False
         return True
 
-    async def create_group(self, group_name: str, description: str = ''):
+    async def create_group(self, group_name: str, description: str = '', exist_ok: bool = False):
         group_dn = self.format_group_dn(group_name)
+        if exist_ok:
+            try:
+                await run_in_threadpool(self.conn.search_s, group_dn, ldap.SCOPE_BASE)
+                return
+            except ldap.NO_SUCH_OBJECT:
+                pass
+
         user_object_class = f'{ConfigSettings.LDAP_PREFIX}-{group_name}'.encode()
         attrs = {'objectclass': self.objectclass, ConfigSettings.LDAP_USER_QUERY_FIELD: user_object_class}
         if description:
@@ -231,7 +239,7 @@ class LdapClient:
             attrs['gidNumber'] = str(ldap_id_obj.id).encode('utf-8')
 
         ldif = modlist.addModlist(attrs)
-        self.conn.add_s(group_dn, ldif)
+        await run_in_threadpool(self.conn.add_s, group_dn, ldif)
 
     async def delete_group(self, group_name: str):
         group_dn = self.format_group_dn(group_name)
@@ -0,0 +1,80 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Triggers notifying workers about changes of project policies.
+
+All policy tables share one trigger function, so every notification carries the affected project code as payload the
+way PolicyChangeListener expects it.
+"""
+
+from alembic import op
+
+from app.commons.policy_cache.listener import POLICY_CHANGES_CHANNEL
+
+FUNCTION = 'notify_policy_changed'
+
+EVENTS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def create_notify_function(schema: str) -> None:
+    """Create trigger function notifying every project changed by a statement once.
+
+    Name of the column holding the project code is passed as the only trigger argument.
+    """
+
+    op.execute(
+        f'''
+        CREATE OR REPLACE FUNCTION {schema}.{FUNCTION}() RETURNS trigger AS $$
+        DECLARE
+            changed_project_code text;
+            changed_rows text;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changed_rows := format('SELECT %1$I FROM new_rows', TG_ARGV[0]);
+            ELSIF TG_OP = 'DELETE' THEN
+                changed_rows := format('SELECT %1$I FROM old_rows', TG_ARGV[0]);
+            ELSE
+                changed_rows := format('SELECT %1$I FROM old_rows UNION SELECT %1$I FROM new_rows', TG_ARGV[0]);
+            END IF;
+            FOR changed_project_code IN EXECUTE format(
+                'SELECT DISTINCT code FROM (%s) AS changed_rows(code) WHERE code IS NOT NULL', changed_rows
+            ) LOOP
+                PERFORM pg_notify('{POLICY_CHANGES_CHANNEL}', changed_project_code);
+            END LOOP;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        '''
+    )
+
+
+def drop_notify_function(schema: str) -> None:
+    op.execute(f'DROP FUNCTION IF EXISTS {schema}.{FUNCTION}()')
+
+
+def create_notify_triggers(schema: str, table: str, column: str) -> None:
+    """Create statement level triggers notifying projects in column of table rows changed by a statement.
+
+    Transition tables let the function notify every affected project once, so bulk changes such as copying the default
+    policy do not run the trigger for every row.
+    """
+
+    for event, transition_tables in EVENTS.items():
+        op.execute(
+            f'''
+            CREATE TRIGGER {table}_{event.lower()}_notify
+            AFTER {event} ON {schema}.{table} {transition_tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION {schema}.{FUNCTION}('{column}')
+            '''
+        )
+
+
+def drop_notify_triggers(schema: str, table: str) -> None:
+    for event in EVENTS:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_{event.lower()}_notify ON {schema}.{table}')
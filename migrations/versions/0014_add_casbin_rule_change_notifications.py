@@ -0,0 +1,34 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add casbin rule change notifications.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17 10:12:45.118273
+"""
+
+from app.models.permissions import CasbinRule
+from migrations.policy_notifications import create_notify_function
+from migrations.policy_notifications import create_notify_triggers
+from migrations.policy_notifications import drop_notify_function
+from migrations.policy_notifications import drop_notify_triggers
+
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = '0013'
+
+SCHEMA = CasbinRule.__table__.schema
+
+
+def upgrade():
+    create_notify_function(SCHEMA)
+    create_notify_triggers(SCHEMA, 'casbin_rule', 'v4')
+
+
+def downgrade():
+    drop_notify_triggers(SCHEMA, 'casbin_rule')
+    drop_notify_function(SCHEMA)
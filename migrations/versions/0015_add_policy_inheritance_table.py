@@ -0,0 +1,39 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add policy inheritance table.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-17 19:24:08.530417
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.models.permissions import PolicyInheritanceModel
+from migrations.policy_notifications import create_notify_triggers
+
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = '0014'
+
+SCHEMA = PolicyInheritanceModel.__table__.schema
+
+
+def upgrade():
+    op.create_table(
+        'policy_inheritance',
+        sa.Column('project_code', sa.String(length=255), nullable=False),
+        sa.Column('time_created', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('project_code'),
+        schema=SCHEMA,
+    )
+    create_notify_triggers(SCHEMA, 'policy_inheritance', 'project_code')
+
+
+def downgrade():
+    op.drop_table('policy_inheritance', schema=SCHEMA)
@@ -0,0 +1,87 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add casbin rule policy indexes.
+
+Writes to casbin_rule must be paused while this migration runs. Duplicates are removed before the unique index is built
+concurrently outside of that transaction, so a duplicate written in between makes building the index fail. The invalid
+index is dropped in that case and the migration can be run again.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-17 20:02:51.804113
+"""
+
+from alembic import op
+
+from app.models.permissions import CasbinRule
+
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = '0015'
+
+SCHEMA = CasbinRule.__table__.schema
+
+
+def upgrade():
+    op.execute(
+        f'''
+        DELETE FROM {SCHEMA}.casbin_rule duplicate
+        USING {SCHEMA}.casbin_rule original
+        WHERE duplicate.id > original.id
+            AND duplicate.v4 IS NOT DISTINCT FROM original.v4
+            AND duplicate.v2 IS NOT DISTINCT FROM original.v2
+            AND duplicate.v3 IS NOT DISTINCT FROM original.v3
+            AND duplicate.v1 IS NOT DISTINCT FROM original.v1
+            AND duplicate.v0 IS NOT DISTINCT FROM original.v0
+            AND duplicate.ptype IS NOT DISTINCT FROM original.ptype
+        '''
+    )
+
+    with op.get_context().autocommit_block():
+        try:
+            op.create_index(
+                'casbin_rule_policy_unique',
+                'casbin_rule',
+                ['v4', 'v2', 'v3', 'v1', 'v0', 'ptype'],
+                unique=True,
+                schema=SCHEMA,
+                postgresql_concurrently=True,
+            )
+            op.execute(
+                f'ALTER TABLE {SCHEMA}.casbin_rule '
+                'ADD CONSTRAINT casbin_rule_policy_unique UNIQUE USING INDEX casbin_rule_policy_unique'
+            )
+        except Exception:
+            # Failed concurrent build leaves an invalid index behind that would block running the migration again
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {SCHEMA}.casbin_rule_policy_unique')
+            raise
+        op.create_index(
+            'ix_casbin_rule_v4_id',
+            'casbin_rule',
+            ['v4', 'id'],
+            unique=False,
+            schema=SCHEMA,
+            postgresql_include=['ptype', 'v0', 'v1', 'v2', 'v3', 'v5'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_pilot_casbin_casbin_rule_v4', table_name='casbin_rule', schema=SCHEMA, postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pilot_casbin_casbin_rule_v4',
+            'casbin_rule',
+            ['v4'],
+            unique=False,
+            schema=SCHEMA,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_casbin_rule_v4_id', table_name='casbin_rule', schema=SCHEMA, postgresql_concurrently=True)
+        op.drop_constraint('casbin_rule_policy_unique', 'casbin_rule', type_='unique', schema=SCHEMA)
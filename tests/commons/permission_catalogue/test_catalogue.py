@@ -0,0 +1,153 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from app.commons.permission_catalogue import CATALOGUE_VERSION_KEY
+from app.commons.permission_catalogue import PermissionCatalogue
+from app.commons.permission_catalogue import PermissionCatalogueCache
+from app.commons.policy_cache import PolicyVersions
+
+
+def create_permission(name: str | None, sorting_position: int | None) -> tuple[dict, dict]:
+    raw = {'name': name, 'sorting_position': sorting_position}
+    return raw, {'name': name or '', 'sorting_position': sorting_position or ''}
+
+
+@pytest.fixture
+def catalogue() -> PermissionCatalogue:
+    permissions = [
+        create_permission('b', 2),
+        create_permission(None, 3),
+        create_permission('c', None),
+        create_permission('a', 1),
+    ]
+    yield PermissionCatalogue(permissions, migration_version='0001')
+
+
+class TestPermissionCatalogue:
+    @pytest.mark.parametrize(
+        'order_by,order_type,expected_names',
+        [
+            ('name', 'asc', ['a', 'b', 'c', '']),
+            ('name', 'desc', ['', 'c', 'b', 'a']),
+            ('sorting_position', 'asc', ['a', 'b', '', 'c']),
+            ('sorting_position', 'desc', ['c', '', 'b', 'a']),
+        ],
+    )
+    def test_list_permissions_sorts_null_values_like_postgres(self, catalogue, order_by, order_type, expected_names):
+        permissions = catalogue.list_permissions(order_by, order_type, page=0, page_size=10)
+
+        assert [permission['name'] for permission in permissions] == expected_names
+
+    def test_list_permissions_returns_requested_page(self, catalogue):
+        permissions = catalogue.list_permissions('name', 'asc', page=1, page_size=3)
+
+        assert permissions == [{'name': '', 'sorting_position': 3}]
+        assert catalogue.total == 4
+
+    def test_list_permissions_returns_copies_of_permissions(self, catalogue):
+        permissions = catalogue.list_permissions('name', 'asc', page=0, page_size=1)
+        permissions[0]['permissions'] = {}
+
+        assert catalogue.list_permissions('name', 'asc', page=0, page_size=1) == [{'name': 'a', 'sorting_position': 1}]
+
+    def test_revision_changes_with_permissions_content(self, catalogue):
+        same_catalogue = PermissionCatalogue(
+            [
+                create_permission('a', 1),
+                create_permission('b', 2),
+                create_permission(None, 3),
+                create_permission('c', None),
+            ],
+            migration_version='0001',
+        )
+        other_catalogue = PermissionCatalogue([create_permission('a', 1)], migration_version='0001')
+
+        assert same_catalogue.revision == catalogue.revision
+        assert other_catalogue.revision != catalogue.revision
+
+    def test_list_permissions_raises_value_error_for_unknown_column(self, catalogue):
+        with pytest.raises(ValueError):
+            catalogue.list_permissions('unknown', 'asc', page=0, page_size=10)
+
+
+class TestPermissionCatalogueCache:
+    def test_get_loads_catalogue_once_while_migration_version_is_unchanged(self, mocker):
+        load = mocker.Mock(side_effect=lambda version: PermissionCatalogue([], version))
+        catalogue_cache = PermissionCatalogueCache(load, lambda: '0001', check_interval=0, versions=PolicyVersions())
+
+        first_catalogue = catalogue_cache.get()
+        second_catalogue = catalogue_cache.get()
+
+        assert first_catalogue is second_catalogue
+        assert load.call_count == 1
+        assert catalogue_cache.stats['checks'] == 2
+
+    def test_get_reloads_catalogue_after_migration_version_changes(self, mocker):
+        get_migration_version = mocker.Mock(side_effect=['0001', '0002'])
+        catalogue_cache = PermissionCatalogueCache(
+            lambda version: PermissionCatalogue([], version),
+            get_migration_version,
+            check_interval=0,
+            versions=PolicyVersions(),
+        )
+
+        first_catalogue = catalogue_cache.get()
+        second_catalogue = catalogue_cache.get()
+
+        assert first_catalogue.migration_version == '0001'
+        assert second_catalogue.migration_version == '0002'
+
+    def test_get_does_not_check_migration_version_within_check_interval(self, mocker):
+        get_migration_version = mocker.Mock(return_value='0001')
+        catalogue_cache = PermissionCatalogueCache(
+            lambda version: PermissionCatalogue([], version),
+            get_migration_version,
+            check_interval=60,
+            versions=PolicyVersions(),
+        )
+
+        catalogue_cache.get()
+        catalogue_cache.get()
+
+        assert get_migration_version.call_count == 1
+        assert catalogue_cache.stats['hits'] == 1
+
+    def test_reload_loads_catalogue_regardless_of_migration_version(self, mocker):
+        load = mocker.Mock(side_effect=lambda version: PermissionCatalogue([], version))
+        catalogue_cache = PermissionCatalogueCache(load, lambda: '0001', check_interval=60, versions=PolicyVersions())
+
+        first_catalogue = catalogue_cache.get()
+        second_catalogue = catalogue_cache.reload()
+
+        assert second_catalogue is not first_catalogue
+        assert catalogue_cache.get() is second_catalogue
+        assert load.call_count == 2
+
+    def test_get_reloads_catalogue_after_reload_was_requested_by_other_worker(self, mocker):
+        load = mocker.Mock(side_effect=lambda version: PermissionCatalogue([], version))
+        versions = PolicyVersions()
+        catalogue_cache = PermissionCatalogueCache(load, lambda: '0001', check_interval=60, versions=versions)
+
+        first_catalogue = catalogue_cache.get()
+        versions.bump(CATALOGUE_VERSION_KEY, notify=False)
+        second_catalogue = catalogue_cache.get()
+
+        assert second_catalogue is not first_catalogue
+        assert load.call_count == 2
+
+    def test_reload_notifies_policy_version_subscribers(self):
+        versions = PolicyVersions()
+        notified = []
+        versions.subscribe(notified.append)
+        catalogue_cache = PermissionCatalogueCache(
+            lambda version: PermissionCatalogue([], version), lambda: '0001', check_interval=60, versions=versions
+        )
+
+        catalogue_cache.reload()
+
+        assert notified == [CATALOGUE_VERSION_KEY]
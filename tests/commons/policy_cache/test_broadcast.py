@@ -0,0 +1,55 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+
+import pytest
+
+from app.commons.policy_cache import PolicyVersions
+from app.commons.policy_cache.broadcast import PolicyBroadcaster
+
+
+@pytest.fixture
+def broadcaster() -> PolicyBroadcaster:
+    yield PolicyBroadcaster('redis://localhost', 'channel', PolicyVersions())
+
+
+class TestPolicyBroadcaster:
+    def test_receive_bumps_project_version_for_message_from_another_worker(self, broadcaster, fake):
+        project_code = fake.project_code()
+        message = json.dumps({'origin': 'another-worker', 'project_code': project_code})
+
+        broadcaster.receive(message)
+
+        assert broadcaster.versions.get(project_code) == (0, 1)
+
+    def test_receive_ignores_messages_published_by_itself(self, broadcaster, fake):
+        project_code = fake.project_code()
+        message = json.dumps({'origin': broadcaster.origin, 'project_code': project_code})
+
+        broadcaster.receive(message)
+
+        assert broadcaster.versions.get(project_code) == (0, 0)
+
+    def test_receive_ignores_malformed_messages(self, broadcaster):
+        broadcaster.receive(b'malformed')
+
+    async def test_local_version_bump_is_queued_for_publishing(self, broadcaster, fake, mocker):
+        project_code = fake.project_code()
+        mocker.patch.object(broadcaster, '_publish_messages', return_value=None)
+        mocker.patch.object(broadcaster, '_receive_messages', return_value=None)
+        await broadcaster.start()
+
+        broadcaster.versions.bump(project_code)
+        await asyncio.sleep(0)
+
+        assert broadcaster._queue.get_nowait() == project_code
+        assert broadcaster.versions.synchronized is False
+
+        await broadcaster.stop()
+
+        assert broadcaster.versions.synchronized is True
@@ -0,0 +1,103 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from datetime import datetime
+
+import pytest
+
+from app.commons.policy_cache import PolicyVersions
+from app.commons.policy_cache.matrix import ProjectMatrix
+from app.commons.policy_cache.matrix import ProjectMatrixCache
+from app.commons.policy_cache.matrix import etag_matches
+
+
+def build_matrix(project_code: str) -> ProjectMatrix:
+    return ProjectMatrix(permissions={}, roles=[], etag=project_code)
+
+
+@pytest.fixture
+def matrix_cache() -> ProjectMatrixCache:
+    yield ProjectMatrixCache(PolicyVersions(), size=2, ttl=60)
+
+
+class TestProjectMatrixCache:
+    def test_get_returns_cached_matrix_until_project_policy_version_changes(self, matrix_cache, fake):
+        project_code = fake.project_code()
+
+        first_matrix = matrix_cache.get(project_code, build_matrix)
+        second_matrix = matrix_cache.get(project_code, build_matrix)
+        matrix_cache.versions.bump(project_code)
+        third_matrix = matrix_cache.get(project_code, build_matrix)
+
+        assert first_matrix is second_matrix
+        assert third_matrix is not first_matrix
+        assert matrix_cache.stats['hits'] == 1
+        assert matrix_cache.stats['builds'] == 2
+
+    def test_get_rebuilds_matrix_when_default_policy_version_changes(self, matrix_cache, fake):
+        project_code = fake.project_code()
+
+        first_matrix = matrix_cache.get(project_code, build_matrix)
+        matrix_cache.versions.bump('pilotdefault')
+
+        assert matrix_cache.get(project_code, build_matrix) is not first_matrix
+
+    def test_get_rebuilds_matrix_when_revision_changes(self, matrix_cache, fake):
+        project_code = fake.project_code()
+
+        first_matrix = matrix_cache.get(project_code, build_matrix, '0001')
+
+        assert matrix_cache.get(project_code, build_matrix, '0001') is first_matrix
+        assert matrix_cache.get(project_code, build_matrix, '0002') is not first_matrix
+
+    def test_get_evicts_least_recently_used_matrix_when_cache_is_full(self, matrix_cache, fake):
+        for _ in range(3):
+            matrix_cache.get(fake.project_code(), build_matrix)
+
+        assert len(matrix_cache) == 2
+        assert matrix_cache.stats['evictions'] == 1
+
+
+class TestProjectMatrix:
+    def test_list_roles_returns_default_roles_sorted_by_name_before_other_roles(self):
+        roles = [
+            {'name': name, 'is_default': is_default, 'time_created': datetime(2023, 1, day)}
+            for name, is_default, day in [
+                ('contributor', True, 1),
+                ('reviewer', False, 3),
+                ('admin', True, 2),
+                ('auditor', False, 4),
+            ]
+        ]
+        matrix = ProjectMatrix(permissions={}, roles=[(role, {'name': role['name']}) for role in roles], etag='')
+
+        assert matrix.list_roles('time_created', 'desc') == [
+            {'name': 'admin'},
+            {'name': 'contributor'},
+            {'name': 'auditor'},
+            {'name': 'reviewer'},
+        ]
+
+    def test_get_etag_differs_for_different_request_parts(self):
+        matrix = ProjectMatrix(permissions={}, roles=[], etag='etag')
+
+        assert matrix.get_etag('page=0') == matrix.get_etag('page=0')
+        assert matrix.get_etag('page=0') != matrix.get_etag('page=1')
+
+
+@pytest.mark.parametrize(
+    'if_none_match,expected_result',
+    [
+        (None, False),
+        ('"other"', False),
+        ('"etag"', True),
+        ('W/"etag"', True),
+        ('"other", "etag"', True),
+        ('*', True),
+    ],
+)
+def test_etag_matches_checks_all_etags_in_header(if_none_match, expected_result):
+    assert etag_matches(if_none_match, '"etag"') is expected_result
@@ -0,0 +1,210 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+from fastapi_sqlalchemy import db
+
+from app.commons.permission_catalogue import PermissionCatalogue
+from app.commons.psql_services.permissions import clone_role
+from app.commons.psql_services.permissions import create_casbin_rule
+from app.commons.psql_services.permissions import create_casbin_rule_bulk
+from app.commons.psql_services.permissions import create_role_record
+from app.commons.psql_services.permissions import delete_casbin_rule
+from app.commons.psql_services.permissions import delete_casbin_rules_bulk
+from app.commons.psql_services.permissions import get_permission_catalogue
+from app.commons.psql_services.permissions import get_project_matrix
+from app.commons.psql_services.permissions import sync_casbin_rules
+from app.models.permissions import DEFAULT_PROJECT_CODE
+from app.models.permissions import CasbinRule
+from app.models.permissions import PermissionMetadataModel
+from app.models.permissions import PolicyInheritanceModel
+from app.models.permissions import RoleModel
+from app.resources.error_handler import APIException
+
+
+class TestCreateCasbinRule:
+    def test_create_casbin_rule_raises_conflict_when_rule_already_exists(self, db_for_common_tests, fake):
+        project_code = fake.project_code()
+        create_casbin_rule('admin', 'project', 'view', 'greenroom', project_code)
+
+        with pytest.raises(APIException) as exc_info:
+            create_casbin_rule('admin', 'project', 'view', 'greenroom', project_code)
+
+        assert exc_info.value.status_code == 409
+
+
+class TestCreateCasbinRuleBulk:
+    def test_create_casbin_rule_bulk_skips_existing_rules_and_returns_number_of_created_rules(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        permissions = db.session.query(PermissionMetadataModel).limit(3).all()
+        permission_ids = [str(permission.id) for permission in permissions]
+        create_casbin_rule(
+            'admin', permissions[0].resource, permissions[0].operation, permissions[0].zone, project_code
+        )
+
+        created = create_casbin_rule_bulk({'admin': permission_ids, 'collaborator': permission_ids[:1]}, project_code)
+        created_again = create_casbin_rule_bulk({'admin': permission_ids}, project_code)
+
+        assert created == 3
+        assert created_again == 0
+        assert db.session.query(CasbinRule).filter_by(v4=project_code).count() == 4
+
+    def test_create_casbin_rule_bulk_raises_not_found_when_role_has_no_existing_metadata(
+        self, db_for_common_tests, fake
+    ):
+        with pytest.raises(APIException) as exc_info:
+            create_casbin_rule_bulk({'admin': [fake.uuid4()]}, fake.project_code())
+
+        assert exc_info.value.status_code == 404
+
+
+class TestDeleteCasbinRule:
+    def test_delete_casbin_rule_keeps_default_policy_inheritance_when_deleting_project_rule(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        db.session.add(PolicyInheritanceModel(project_code=project_code))
+        db.session.commit()
+        create_casbin_rule('reviewer', 'project', 'view', 'greenroom', project_code)
+
+        delete_casbin_rule('reviewer', 'project', 'view', 'greenroom', project_code)
+
+        assert db.session.query(PolicyInheritanceModel).get(project_code) is not None
+        assert db.session.query(CasbinRule).filter_by(v4=project_code).count() == 0
+
+
+class TestDeleteCasbinRulesBulk:
+    def test_delete_casbin_rules_bulk_deletes_only_requested_rules_and_returns_number_of_deleted_rules(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        permissions = db.session.query(PermissionMetadataModel).limit(2).all()
+        permission_ids = [str(permission.id) for permission in permissions]
+        create_casbin_rule_bulk({'admin': permission_ids, 'collaborator': permission_ids}, project_code)
+
+        deleted = delete_casbin_rules_bulk({'admin': permission_ids, 'collaborator': permission_ids[:1]}, project_code)
+        deleted_again = delete_casbin_rules_bulk({'admin': permission_ids}, project_code)
+
+        assert deleted == 3
+        assert deleted_again == 0
+        remaining_rule = db.session.query(CasbinRule).filter_by(v4=project_code).one()
+        assert (remaining_rule.v0, remaining_rule.v2, remaining_rule.v3) == (
+            'collaborator',
+            permissions[1].resource,
+            permissions[1].operation,
+        )
+
+    def test_delete_casbin_rules_bulk_keeps_default_policy_inheritance_when_rules_are_not_inherited(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        db.session.add(PolicyInheritanceModel(project_code=project_code))
+        db.session.commit()
+        permission = db.session.query(PermissionMetadataModel).first()
+
+        deleted = delete_casbin_rules_bulk({f'role{fake.pyint()}': [str(permission.id)]}, project_code)
+
+        assert deleted == 0
+        assert db.session.query(PolicyInheritanceModel).get(project_code) is not None
+
+    def test_delete_casbin_rules_bulk_materializes_default_policy_when_deleting_inherited_rule(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        role = f'role{fake.pyint()}'
+        permission = db.session.query(PermissionMetadataModel).first()
+        create_casbin_rule(role, permission.resource, permission.operation, permission.zone, DEFAULT_PROJECT_CODE)
+        db.session.add(PolicyInheritanceModel(project_code=project_code))
+        db.session.commit()
+
+        try:
+            deleted = delete_casbin_rules_bulk({role: [str(permission.id)]}, project_code)
+        finally:
+            db.session.query(CasbinRule).filter_by(v0=role, v4=DEFAULT_PROJECT_CODE).delete()
+            db.session.commit()
+
+        assert deleted == 1
+        assert db.session.query(PolicyInheritanceModel).get(project_code) is None
+        assert db.session.query(CasbinRule).filter_by(v0=role, v4=project_code).count() == 0
+
+
+class TestGetProjectMatrix:
+    def test_get_project_matrix_builds_matrix_for_permissions_of_catalogue(self, db_for_common_tests, fake):
+        project_code = fake.project_code()
+        permission = db.session.query(PermissionMetadataModel).first()
+        create_casbin_rule('admin', permission.resource, permission.operation, permission.zone, project_code)
+        columns = get_permission_catalogue(None).permissions
+        catalogue = PermissionCatalogue(
+            [(column_values, {}) for column_values in columns if column_values['id'] == permission.id],
+            migration_version=None,
+        )
+
+        matrix = get_project_matrix(project_code, catalogue)
+
+        assert matrix.permissions == {str(permission.id): {'admin': True}}
+
+
+class TestSyncCasbinRules:
+    def test_sync_casbin_rules_keeps_default_policy_inheritance_when_only_creating_rules(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        db.session.add(PolicyInheritanceModel(project_code=project_code))
+        db.session.commit()
+        permission = db.session.query(PermissionMetadataModel).first()
+
+        result = sync_casbin_rules({'reviewer': [str(permission.id)]}, project_code)
+
+        assert result == {'created': 1, 'deleted': 0}
+        assert db.session.query(PolicyInheritanceModel).get(project_code) is not None
+        assert db.session.query(CasbinRule).filter_by(v4=project_code).count() == 1
+
+    def test_sync_casbin_rules_materializes_default_policy_when_deleting_inherited_rule(
+        self, db_for_common_tests, fake
+    ):
+        project_code = fake.project_code()
+        role = f'role{fake.pyint()}'
+        permission = db.session.query(PermissionMetadataModel).first()
+        create_casbin_rule(role, permission.resource, permission.operation, permission.zone, DEFAULT_PROJECT_CODE)
+        db.session.add(PolicyInheritanceModel(project_code=project_code))
+        db.session.commit()
+
+        try:
+            result = sync_casbin_rules({role: []}, project_code)
+        finally:
+            db.session.query(CasbinRule).filter_by(v0=role, v4=DEFAULT_PROJECT_CODE).delete()
+            db.session.commit()
+
+        assert result == {'created': 0, 'deleted': 1}
+        assert db.session.query(PolicyInheritanceModel).get(project_code) is None
+        assert db.session.query(CasbinRule).filter_by(v0=role, v4=project_code).count() == 0
+
+
+class TestCloneRole:
+    def test_clone_role_copies_rules_and_creates_role_record(self, db_for_common_tests, fake):
+        project_code = fake.project_code()
+        create_role_record('contributor', project_code, True)
+        create_casbin_rule('contributor', 'project', 'view', 'greenroom', project_code)
+
+        copied = clone_role('contributor', 'reviewer', project_code)
+
+        assert copied == 1
+        rule = db.session.query(CasbinRule).filter_by(v0='reviewer', v4=project_code).one()
+        assert (rule.v1, rule.v2, rule.v3) == ('greenroom', 'project', 'view')
+        role = db.session.query(RoleModel).filter_by(name='reviewer', project_code=project_code).one()
+        assert role.is_default is False
+
+    def test_clone_role_raises_conflict_when_new_role_exists(self, db_for_common_tests, fake):
+        project_code = fake.project_code()
+        create_role_record('contributor', project_code, True)
+        create_role_record('reviewer', project_code, False)
+
+        with pytest.raises(APIException) as exc_info:
+            clone_role('contributor', 'reviewer', project_code)
+
+        assert exc_info.value.status_code == 409
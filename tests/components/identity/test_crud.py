@@ -6,9 +6,12 @@
 
 from uuid import UUID
 
+import httpx
 import pytest
 
 from app.components.identity.crud import IdentityCRUD
+from app.components.keycloak.models import User
+from app.components.keycloak.user_cache import UserCache
 from app.resources.keycloak_api.ops_admin import OperationsAdmin
 
 
@@ -29,6 +32,40 @@ class TestIdentityCRUD:
         assert isinstance(admin_client, OperationsAdmin) is True
         assert admin_client.header == expected_headers
         assert admin_client.keycloak_admin.connection.headers == expected_headers
+        assert admin_client.client is keycloak_client.client
+
+    async def test_create_operations_admin_reuses_instance_and_refreshes_headers_when_access_token_changes(
+        self, keycloak_client, fake
+    ):
+        keycloak_client.access_token = fake.pystr()
+        keycloak_client.access_token_expiration = 2**100
+        identity_crud = IdentityCRUD(keycloak_client)
+
+        first_admin_client = await identity_crud.create_operations_admin()
+        keycloak_admin = first_admin_client.keycloak_admin
+        keycloak_client.access_token = fake.pystr()
+        second_admin_client = await identity_crud.create_operations_admin()
+
+        expected_authorization = f'Bearer {keycloak_client.access_token}'
+        assert second_admin_client is first_admin_client
+        assert second_admin_client.keycloak_admin is keycloak_admin
+        assert second_admin_client.header['Authorization'] == expected_authorization
+        assert keycloak_admin.connection.headers['Authorization'] == expected_authorization
+
+    async def test_operations_admin_indexes_realm_roles_looked_up_by_name(self, keycloak_client, mocker, fake):
+        keycloak_client.access_token_expiration = 2**100
+        identity_crud = IdentityCRUD(keycloak_client)
+        admin_client = await identity_crud.create_operations_admin()
+        role = {'id': fake.uuid4(), 'name': fake.word()}
+        admin_client.keycloak_admin = mocker.AsyncMock()
+        admin_client.keycloak_admin.get_realm_role.return_value = role
+
+        await admin_client.assign_user_role(fake.uuid4(), role['name'])
+        await admin_client.assign_user_role(fake.uuid4(), role['name'])
+
+        admin_client.keycloak_admin.get_realm_role.assert_awaited_once_with(role_name=role['name'])
+        admin_client.keycloak_admin.get_realm_roles.assert_not_awaited()
+        assert admin_client.keycloak_admin.assign_realm_roles.call_args.kwargs['roles'] == [role]
 
     async def test_get_user_by_username_returns_user_by_username(self, keycloak_client_mock, identity_crud):
         created_user = keycloak_client_mock.create_user()
@@ -37,6 +74,33 @@ class TestIdentityCRUD:
 
         assert received_user == created_user
 
+    async def test_get_user_by_username_returns_user_from_user_cache(self, keycloak_client_mock):
+        created_user = keycloak_client_mock.create_user()
+        identity_crud = IdentityCRUD(keycloak_client_mock, UserCache(size=1, ttl=60))
+
+        await identity_crud.get_user_by_username(created_user['username'])
+        received_user = await identity_crud.get_user_by_username(created_user['username'])
+
+        assert isinstance(received_user, User) is True
+        assert received_user == created_user
+        assert identity_crud.user_cache.stats['hits'] == 1
+
+    @pytest.mark.parametrize('status_code,cached_users', [(204, 0), (500, 1)])
+    async def test_sync_user_trigger_clears_user_cache_only_after_successful_sync(
+        self, status_code, cached_users, keycloak_client, fake, mocker
+    ):
+        keycloak_client.access_token = fake.pystr()
+        keycloak_client.access_token_expiration = 2**100
+        identity_crud = IdentityCRUD(keycloak_client, UserCache(size=1, ttl=60))
+        user = {'id': fake.uuid4(), 'username': fake.user_name(), 'email': fake.email()}
+        await identity_crud.user_cache.get('id', user['id'], mocker.AsyncMock(return_value=user))
+        operations_admin = await identity_crud.create_operations_admin()
+        mocker.patch.object(operations_admin.client, 'post', return_value=httpx.Response(status_code))
+
+        await operations_admin.sync_user_trigger()
+
+        assert len(identity_crud.user_cache) == cached_users
+
     async def test_get_user_by_username_returns_none_when_user_not_found(self, identity_crud):
         received_user = await identity_crud.get_user_by_username('non-existing')
 
@@ -4,11 +4,13 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 from http import HTTPStatus
 from urllib.parse import urlencode
 from uuid import UUID
 
 import pytest
+from werkzeug import Response
 
 from app.components.exceptions import NotFound
 
@@ -38,6 +40,11 @@ class TestKeycloakClient:
 
         assert keycloak_client.is_authorization_expiring_soon is expected_result
 
+    async def test_close_closes_underlying_http_client(self, keycloak_client):
+        await keycloak_client.close()
+
+        assert keycloak_client.client.is_closed is True
+
     async def test_request_makes_request_and_returns_response(self, keycloak_client, httpserver, fake):
         expected_response_json = {'key': fake.pystr()}
         httpserver.expect_oneshot_request('/path', method='GET').respond_with_json(expected_response_json)
@@ -132,6 +139,49 @@ class TestKeycloakClient:
         assert keycloak_client.access_token == expected_access_token
         assert keycloak_client.access_token_expiration == expected_access_token_expiration
 
+    async def test_authorize_makes_single_token_request_for_concurrent_callers(self, keycloak_client, httpserver, fake):
+        token_url = f'/realms/{keycloak_client.realm}/protocol/openid-connect/token'
+        expected_access_token = fake.pystr()
+        httpserver.expect_request(token_url, method='POST').respond_with_json(
+            {'access_token': expected_access_token, 'expires_in': 60}
+        )
+
+        await asyncio.gather(*(keycloak_client.authorize() for _ in range(5)))
+
+        assert len(httpserver.log) == 1
+        assert keycloak_client.access_token == expected_access_token
+
+    async def test_request_skips_authorization_when_token_was_refreshed_while_request_was_in_flight(
+        self, keycloak_client, httpserver, mocker
+    ):
+        def refresh_token(request):
+            keycloak_client.access_token = 'refreshed'
+            return Response(status=HTTPStatus.UNAUTHORIZED)
+
+        authorize = mocker.patch.object(keycloak_client, 'authorize')
+        httpserver.expect_ordered_request('/path', method='GET').respond_with_handler(refresh_token)
+        httpserver.expect_ordered_request('/path', method='GET').respond_with_json({})
+
+        response = await keycloak_client._request('GET', '/path')
+
+        assert response.status_code == 200
+        authorize.assert_not_called()
+
+    async def test_start_authorization_refresh_refreshes_token_when_refresh_margin_is_left_before_expiration(
+        self, keycloak_client, mocker
+    ):
+        mocker.patch('time.monotonic', return_value=1000.0)
+        sleep = mocker.patch('asyncio.sleep', side_effect=[None, asyncio.CancelledError])
+        authorize = mocker.patch.object(keycloak_client, 'authorize')
+        keycloak_client.access_token_expiration = 1100
+        keycloak_client.token_refresh_margin = 30
+
+        keycloak_client.start_authorization_refresh()
+        await asyncio.wait([keycloak_client._authorization_refresh])
+
+        sleep.assert_any_call(70.0)
+        authorize.assert_called_once()
+
     async def test_get_user_returns_user_by_id(self, keycloak_client, httpserver, fake):
         user_id = fake.uuid4()
         user_url = f'/admin/realms/{keycloak_client.realm}/users/{user_id}'
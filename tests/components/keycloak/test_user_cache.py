@@ -0,0 +1,111 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+import pytest
+
+from app.components.keycloak.user_cache import UserCache
+
+
+@pytest.fixture
+def user_cache() -> UserCache:
+    yield UserCache(size=2, ttl=60)
+
+
+@pytest.fixture
+def user(fake) -> dict:
+    yield {'id': fake.uuid4(), 'username': fake.user_name(), 'email': fake.email()}
+
+
+class TestUserCache:
+    async def test_get_returns_user_cached_by_any_of_its_fields(self, user_cache, user, mocker):
+        load = mocker.AsyncMock(return_value=user)
+
+        first_user = await user_cache.get('email', user['email'], load)
+        second_user = await user_cache.get('id', user['id'], load)
+        third_user = await user_cache.get('username', user['username'], load)
+
+        assert first_user == second_user == third_user == user
+        assert load.await_count == 1
+        assert user_cache.stats['hits'] == 2
+
+    async def test_get_returns_copy_of_cached_user(self, user_cache, user, mocker):
+        load = mocker.AsyncMock(return_value=user)
+
+        received_user = await user_cache.get('id', user['id'], load)
+        received_user['email'] = 'changed'
+
+        assert (await user_cache.get('id', user['id'], load))['email'] == user['email']
+
+    async def test_get_does_not_cache_missing_users(self, user_cache, user, mocker):
+        load = mocker.AsyncMock(return_value=None)
+
+        await user_cache.get('email', user['email'], load)
+        await user_cache.get('email', user['email'], load)
+
+        assert load.await_count == 2
+
+    async def test_get_loads_user_once_for_concurrent_lookups(self, user_cache, user):
+        loads = 0
+
+        async def load():
+            nonlocal loads
+            loads += 1
+            await asyncio.sleep(0.01)
+            return user
+
+        users = await asyncio.gather(*(user_cache.get('id', user['id'], load) for _ in range(5)))
+
+        assert users == [user] * 5
+        assert loads == 1
+
+    async def test_get_reloads_user_after_ttl_expires(self, user_cache, user, mocker):
+        load = mocker.AsyncMock(return_value=user)
+        monotonic = mocker.patch('time.monotonic', return_value=1000.0)
+
+        await user_cache.get('id', user['id'], load)
+        monotonic.return_value = 1061.0
+        await user_cache.get('id', user['id'], load)
+
+        assert load.await_count == 2
+
+    async def test_invalidate_removes_user_for_all_fields(self, user_cache, user, mocker):
+        load = mocker.AsyncMock(return_value=user)
+
+        await user_cache.get('id', user['id'], load)
+        user_cache.invalidate(user['id'])
+        await user_cache.get('email', user['email'], load)
+
+        assert load.await_count == 2
+
+    async def test_invalidate_discards_user_being_loaded(self, user_cache, user):
+        async def load():
+            user_cache.invalidate(user['id'])
+            return user
+
+        await user_cache.get('id', user['id'], load)
+
+        assert len(user_cache) == 0
+
+    async def test_get_evicts_least_recently_used_user_when_cache_is_full(self, user_cache, fake, mocker):
+        users = [{'id': fake.uuid4(), 'username': fake.user_name(), 'email': fake.email()} for _ in range(3)]
+
+        for user in users:
+            await user_cache.get('id', user['id'], lambda user=user: asyncio.sleep(0, user))
+
+        assert len(user_cache) == 2
+        assert user_cache.stats['evictions'] == 1
+        assert [await user_cache.get('email', user['email'], mocker.AsyncMock()) for user in users[1:]] == users[1:]
+
+    async def test_get_always_loads_user_when_cache_is_disabled(self, user, mocker):
+        user_cache = UserCache(size=0, ttl=0)
+        load = mocker.AsyncMock(return_value=user)
+
+        await user_cache.get('id', user['id'], load)
+        await user_cache.get('id', user['id'], load)
+
+        assert load.await_count == 2
@@ -16,6 +16,7 @@ from fastapi.testclient import TestClient
 from fastapi_sqlalchemy import DBSessionMiddleware
 from fastapi_sqlalchemy import db as db_session
 from httpx import AsyncClient
+from keycloak.exceptions import KeycloakGetError
 from sqlalchemy import create_engine
 from sqlalchemy.schema import CreateSchema
 from sqlalchemy_utils import create_database
@@ -197,6 +198,12 @@ def keycloak_admin_mock(mocker, httpx_mock, request):  # noqa: C901
         async def get_realm_roles(*args, **kwargs):
             return [{'name': 'indoctestproject-admin'}, {'name': 'indoctestproject-collaborator'}]
 
+        async def get_realm_role(*args, role_name, **kwargs):
+            for role in await KeycloakAdminMock.get_realm_roles():
+                if role['name'] == role_name:
+                    return role
+            raise KeycloakGetError(error_message='Could not find role', response_code=404)
+
         async def assign_realm_roles(*args, **kwargs):
             pass
 
@@ -10,6 +10,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.permissions import CasbinRule
+from app.models.permissions import PolicyInheritanceModel
 
 
 class CasbinRuleFactory:
@@ -69,3 +70,33 @@ async def casbin_rule_factory(db_session, fake):
     casbin_rule_factory = CasbinRuleFactory(db_session, fake)
     yield casbin_rule_factory
     await casbin_rule_factory.truncate_table()
+
+
+class PolicyInheritanceFactory:
+    model = PolicyInheritanceModel
+
+    def __init__(self, db_session: AsyncSession, fake: Faker) -> None:
+        self.session = db_session
+        self.fake = fake
+
+    async def create(self, *, project_code: str = ...) -> PolicyInheritanceModel:
+        if project_code is ...:
+            project_code = self.fake.project_code()
+
+        inheritance = self.model(project_code=project_code)
+
+        self.session.add(inheritance)
+        await self.session.commit()
+
+        return inheritance
+
+    async def truncate_table(self) -> None:
+        statement = text(f'TRUNCATE TABLE {self.model.__table__} CASCADE')
+        await self.session.execute(statement)
+
+
+@pytest.fixture
+async def policy_inheritance_factory(db_session, fake):
+    policy_inheritance_factory = PolicyInheritanceFactory(db_session, fake)
+    yield policy_inheritance_factory
+    await policy_inheritance_factory.truncate_table()
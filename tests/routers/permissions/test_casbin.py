@@ -4,12 +4,23 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import itertools
 import random
+from pathlib import Path
 
 import pytest
+from casbin import Enforcer
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.future import create_engine
 
+import app.routers.permissions
+from app.commons.policy_cache import PolicyVersions
 from app.routers.permissions.casbin import Adapter
+from app.routers.permissions.casbin import DecisionCache
+from app.routers.permissions.casbin import EnforcerPool
+from app.routers.permissions.casbin import Filtering
+from app.routers.permissions.casbin import LayeredPolicy
+from app.routers.permissions.compiled_policy import CompiledPolicy
 
 
 @pytest.fixture
@@ -17,6 +28,96 @@ def adapter(db) -> Adapter:
     yield Adapter(engine=create_engine(db.get_connection_url()))
 
 
+@pytest.fixture
+async def async_adapter(db, db_uri) -> Adapter:
+    async_engine = create_async_engine(db_uri)
+    yield Adapter(engine=create_engine(db.get_connection_url()), async_engine=async_engine)
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def enforcer_pool(adapter) -> EnforcerPool:
+    yield EnforcerPool(adapter, size=2, ttl=60, versions=PolicyVersions())
+
+
+class TestLayeredPolicy:
+    @pytest.mark.parametrize('seed', range(10))
+    def test_enforce_gives_same_decisions_as_enforcer_with_copied_default_rules(self, seed):
+        randomizer = random.Random(seed)
+        model_path = str(Path(app.routers.permissions.__file__).parent / 'model.conf')
+        roles = ['admin', 'collaborator', 'contributor']
+        zones = ['greenroom', 'core', '*']
+        resources = ['project', 'file_any']
+        operations = ['view', 'upload', '*']
+
+        def random_policy(project_code: str) -> list[list[str]]:
+            return [
+                [
+                    randomizer.choice(roles),
+                    randomizer.choice(zones),
+                    randomizer.choice(resources),
+                    randomizer.choice(operations),
+                    project_code,
+                ]
+                for _ in range(randomizer.randint(1, 6))
+            ]
+
+        default_policy = random_policy('pilotdefault')
+        project_policy = random_policy('project')
+        enforcer = Enforcer(model=model_path)
+        for line in project_policy + [line[:4] + ['project'] for line in default_policy]:
+            enforcer.get_model().add_policy('p', 'p', line)
+        layered_policy = LayeredPolicy('project', CompiledPolicy(project_policy), CompiledPolicy(default_policy))
+
+        for request in itertools.product(roles, zones, resources, operations, ['project', 'anotherproject']):
+            assert layered_policy.enforce(*request) is enforcer.enforce(*request), request
+
+
+class TestDecisionCache:
+    def test_get_returns_stored_decision_for_same_policy_version(self):
+        decision_cache = DecisionCache(size=2)
+        request = ('admin', 'core', 'project', 'view', 'project')
+
+        decision_cache.store(request, ((0, 1),), True)
+
+        assert decision_cache.get(request, ((0, 1),), ttl=60) is True
+        assert decision_cache.get(request, ((0, 2),), ttl=60) is None
+        assert decision_cache.stats['hits'] == 1
+        assert decision_cache.stats['misses'] == 1
+
+    def test_get_returns_none_for_expired_decision(self, mocker):
+        decision_cache = DecisionCache(size=2)
+        request = ('admin', 'core', 'project', 'view', 'project')
+        mocker.patch('time.monotonic', return_value=0)
+        decision_cache.store(request, ((0, 0),), False)
+
+        mocker.patch('time.monotonic', return_value=60)
+
+        assert decision_cache.get(request, ((0, 0),), ttl=60) is None
+        assert decision_cache.stats['expirations'] == 1
+        assert len(decision_cache) == 0
+
+    def test_store_evicts_least_recently_used_decision_when_cache_is_full(self):
+        decision_cache = DecisionCache(size=2)
+        requests = [('admin', 'core', 'project', operation, 'project') for operation in ('view', 'upload', 'delete')]
+
+        for request in requests:
+            decision_cache.store(request, ((0, 0),), True)
+
+        assert len(decision_cache) == 2
+        assert decision_cache.stats['evictions'] == 1
+        assert decision_cache.get(requests[0], ((0, 0),), ttl=60) is None
+
+    def test_get_denies_any_request_for_empty_project(self):
+        decision_cache = DecisionCache(size=2)
+
+        decision_cache.store_empty_project('project', ((0, 0),))
+
+        assert decision_cache.get(('admin', 'core', 'project', 'view', 'project'), ((0, 0),), ttl=60) is False
+        assert decision_cache.get(('admin', 'core', 'project', 'view', 'project'), ((0, 1),), ttl=60) is None
+        assert decision_cache.stats['negative_hits'] == 1
+
+
 class TestAdapter:
     async def test_get_enforcer_for_project_loads_policies_filtered_by_project_code(self, adapter, casbin_rule_factory):
         rules = await casbin_rule_factory.bulk_create(3)
@@ -41,3 +142,187 @@ class TestAdapter:
         received_policy = enforcer.model.get_policy('p', 'p')
 
         assert received_policy == []
+
+    async def test_get_compiled_policy_for_project_returns_compiled_policy_of_project_rules(
+        self, adapter, casbin_rule_factory
+    ):
+        rule = await casbin_rule_factory.create()
+
+        policy = await adapter.get_compiled_policy_for_project(rule.v4)
+
+        assert isinstance(policy, CompiledPolicy)
+        assert policy.enforce(rule.v0, rule.v1, rule.v2, rule.v3, rule.v4) is True
+        assert policy.enforce(rule.v0, rule.v1, rule.v2, 'unknown', rule.v4) is False
+
+    async def test_get_compiled_policy_for_project_falls_back_to_enforcer_for_rules_of_unsupported_shape(
+        self, adapter, casbin_rule_factory, db_session
+    ):
+        rule = await casbin_rule_factory.create()
+        rule.v5 = 'extra'
+        await db_session.commit()
+
+        policy = await adapter.get_compiled_policy_for_project(rule.v4)
+
+        assert isinstance(policy, Enforcer)
+
+    async def test_fetch_policy_lines_with_async_engine_returns_same_lines_as_sync_load(
+        self, adapter, async_adapter, casbin_rule_factory
+    ):
+        rules = [
+            await casbin_rule_factory.create(operation=operation, project_code='project')
+            for operation in ('view', 'upload', 'delete')
+        ]
+        await casbin_rule_factory.create()
+
+        lines = await async_adapter.fetch_policy_lines('project')
+
+        assert lines == [str(rule) for rule in rules]
+        assert lines == adapter.load_policy_lines(Filtering(project_code='project'))
+
+    async def test_fetch_default_policy_inheritance_with_async_engine_returns_true_for_inheriting_project(
+        self, async_adapter, policy_inheritance_factory, fake
+    ):
+        inheritance = await policy_inheritance_factory.create()
+
+        assert await async_adapter.fetch_default_policy_inheritance(inheritance.project_code) is True
+        assert await async_adapter.fetch_default_policy_inheritance(fake.project_code()) is False
+
+    async def test_get_enforcer_for_project_with_async_engine_loads_policies_of_project(
+        self, async_adapter, casbin_rule_factory
+    ):
+        rule = await casbin_rule_factory.create()
+
+        enforcer = await async_adapter.get_enforcer_for_project(rule.v4)
+
+        assert enforcer.model.get_policy('p', 'p') == [[rule.v0, rule.v1, rule.v2, rule.v3, rule.v4]]
+
+
+class TestEnforcerPool:
+    async def test_enforce_returns_cached_decision_without_getting_enforcer(self, adapter, casbin_rule_factory, mocker):
+        enforcer_pool = EnforcerPool(adapter, size=2, ttl=60, versions=PolicyVersions(), decision_cache_size=10)
+        rule = await casbin_rule_factory.create()
+        request = (rule.v0, rule.v1, rule.v2, rule.v3, rule.v4)
+
+        assert await enforcer_pool.enforce(*request) is True
+        spy = mocker.spy(enforcer_pool, 'get')
+        assert await enforcer_pool.enforce(*request) is True
+
+        assert spy.call_count == 0
+        assert enforcer_pool.decisions.stats['hits'] == 1
+        assert enforcer_pool.decisions.stats['misses'] == 1
+
+    async def test_enforce_caches_projects_without_rules_negatively(self, adapter, fake):
+        enforcer_pool = EnforcerPool(adapter, size=2, ttl=60, versions=PolicyVersions(), decision_cache_size=10)
+        project_code = fake.project_code()
+
+        assert await enforcer_pool.enforce('admin', 'core', 'project', 'view', project_code) is False
+        assert await enforcer_pool.enforce('admin', 'core', 'project', 'upload', project_code) is False
+
+        assert enforcer_pool.decisions.stats['negative_hits'] == 1
+
+    async def test_enforce_allows_platform_admin_without_getting_enforcer(self, enforcer_pool, fake, mocker):
+        spy = mocker.spy(enforcer_pool, 'get')
+
+        assert await enforcer_pool.enforce('platform_admin', 'core', 'project', 'view', fake.project_code()) is True
+
+        assert spy.call_count == 0
+
+    async def test_get_layers_inheriting_project_policy_over_shared_default_policy(
+        self, enforcer_pool, casbin_rule_factory, policy_inheritance_factory, fake
+    ):
+        default_rule = await casbin_rule_factory.create(project_code='pilotdefault')
+        project_rule = await casbin_rule_factory.create(operation='upload')
+        await policy_inheritance_factory.create(project_code=project_rule.v4)
+        another_project = await policy_inheritance_factory.create()
+
+        enforcer = await enforcer_pool.get(project_rule.v4)
+        another_enforcer = await enforcer_pool.get(another_project.project_code)
+
+        assert isinstance(enforcer, LayeredPolicy)
+        assert enforcer.default_policy is another_enforcer.default_policy
+        assert enforcer.enforce(default_rule.v0, default_rule.v1, default_rule.v2, default_rule.v3, project_rule.v4)
+        assert enforcer.enforce(project_rule.v0, project_rule.v1, project_rule.v2, project_rule.v3, project_rule.v4)
+        assert not another_enforcer.enforce(
+            project_rule.v0, project_rule.v1, project_rule.v2, project_rule.v3, another_project.project_code
+        )
+
+    async def test_get_reloads_inheriting_project_policy_when_default_policy_version_changes(
+        self, enforcer_pool, policy_inheritance_factory
+    ):
+        inheritance = await policy_inheritance_factory.create()
+        first_enforcer = await enforcer_pool.get(inheritance.project_code)
+
+        enforcer_pool.versions.bump('pilotdefault')
+        second_enforcer = await enforcer_pool.get(inheritance.project_code)
+
+        assert first_enforcer is not second_enforcer
+        assert first_enforcer.default_policy is not second_enforcer.default_policy
+
+    async def test_allows_unconditionally_returns_true_for_platform_admin_and_records_short_circuit(
+        self, enforcer_pool
+    ):
+        assert enforcer_pool.allows_unconditionally('platform_admin') is True
+        assert enforcer_pool.allows_unconditionally('admin') is False
+        assert enforcer_pool.stats['short_circuits'] == 1
+        assert len(enforcer_pool) == 0
+
+    async def test_get_returns_pooled_enforcer_without_reloading_policies(
+        self, enforcer_pool, casbin_rule_factory, mocker
+    ):
+        rule = await casbin_rule_factory.create()
+        spy = mocker.spy(enforcer_pool.adapter, 'get_enforcer_for_project')
+
+        first_enforcer = await enforcer_pool.get(rule.v4)
+        second_enforcer = await enforcer_pool.get(rule.v4)
+
+        assert first_enforcer is second_enforcer
+        assert spy.call_count == 1
+        assert enforcer_pool.stats['hits'] == 1
+        assert enforcer_pool.stats['misses'] == 1
+
+    async def test_get_evicts_least_recently_used_enforcer_when_pool_is_full(self, enforcer_pool, fake):
+        project_codes = [fake.project_code() for _ in range(3)]
+
+        for project_code in project_codes:
+            await enforcer_pool.get(project_code)
+
+        assert len(enforcer_pool) == 2
+        assert enforcer_pool.stats['evictions'] == 1
+        assert enforcer_pool._lookup(project_codes[0]) is None
+
+    async def test_get_reloads_policies_when_pooled_enforcer_is_expired(self, enforcer_pool, fake, mocker):
+        project_code = fake.project_code()
+        mocker.patch('time.monotonic', return_value=0)
+        first_enforcer = await enforcer_pool.get(project_code)
+
+        mocker.patch('time.monotonic', return_value=enforcer_pool.ttl)
+        second_enforcer = await enforcer_pool.get(project_code)
+
+        assert first_enforcer is not second_enforcer
+        assert enforcer_pool.stats['expirations'] == 1
+
+    async def test_get_reloads_policies_when_project_policy_version_changes(
+        self, enforcer_pool, casbin_rule_factory, fake
+    ):
+        project_code = fake.project_code()
+        first_enforcer = await enforcer_pool.get(project_code)
+        rule = await casbin_rule_factory.create(project_code=project_code)
+
+        enforcer_pool.versions.bump(project_code)
+        second_enforcer = await enforcer_pool.get(project_code)
+
+        assert first_enforcer is not second_enforcer
+        assert second_enforcer.model.get_policy('p', 'p') == [[rule.v0, rule.v1, rule.v2, rule.v3, rule.v4]]
+        assert enforcer_pool.stats['invalidations'] == 1
+
+    async def test_get_applies_fallback_ttl_when_policy_versions_are_not_synchronized(self, adapter, fake, mocker):
+        enforcer_pool = EnforcerPool(adapter, size=2, ttl=60, versions=PolicyVersions(), fallback_ttl=5)
+        enforcer_pool.versions.set_channel_state('channel', False)
+        project_code = fake.project_code()
+        mocker.patch('time.monotonic', return_value=0)
+        first_enforcer = await enforcer_pool.get(project_code)
+
+        mocker.patch('time.monotonic', return_value=5)
+        second_enforcer = await enforcer_pool.get(project_code)
+
+        assert first_enforcer is not second_enforcer
@@ -0,0 +1,99 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import itertools
+import random
+from pathlib import Path
+
+import pytest
+from casbin import Enforcer
+from casbin.config import Config
+
+import app.routers.permissions
+from app.routers.permissions.compiled_policy import CompiledPolicy
+from app.routers.permissions.compiled_policy import get_unconditional_subjects
+
+MODEL_PATH = str(Path(app.routers.permissions.__file__).parent / 'model.conf')
+
+ROLES = ['admin', 'collaborator', 'contributor', 'platform_admin', '']
+ZONES = ['greenroom', 'core', '*', '']
+RESOURCES = ['project', 'file_any', 'copyrequest', '']
+OPERATIONS = ['view', 'upload', 'delete', '*', '']
+PROJECT_CODES = ['project', 'anotherproject', '']
+
+
+def create_enforcer(policy: list[list[str]]) -> Enforcer:
+    enforcer = Enforcer(model=MODEL_PATH)
+    for line in policy:
+        enforcer.get_model().add_policy('p', 'p', line)
+    return enforcer
+
+
+class TestCompiledPolicy:
+    @pytest.mark.parametrize('seed', range(20))
+    def test_enforce_gives_same_decisions_as_casbin_enforcer(self, seed):
+        randomizer = random.Random(seed)
+        policy = [
+            [
+                randomizer.choice(ROLES[:3]),
+                randomizer.choice(ZONES[:3]),
+                randomizer.choice(RESOURCES[:3]),
+                randomizer.choice(OPERATIONS[:4]),
+                'project',
+            ]
+            for _ in range(randomizer.randint(0, 15))
+        ]
+        enforcer = create_enforcer(policy)
+        compiled_policy = CompiledPolicy(policy)
+
+        for request in itertools.product(ROLES, ZONES, RESOURCES, OPERATIONS, PROJECT_CODES):
+            assert compiled_policy.enforce(*request) is enforcer.enforce(*request), request
+
+    def test_enforce_gives_same_decisions_as_casbin_enforcer_for_empty_policy(self):
+        enforcer = create_enforcer([])
+        compiled_policy = CompiledPolicy([])
+
+        for request in itertools.product(ROLES, ZONES, RESOURCES, OPERATIONS, PROJECT_CODES):
+            assert compiled_policy.enforce(*request) is enforcer.enforce(*request), request
+
+    def test_enforce_allows_action_in_any_zone_for_wildcard_zone_policy(self):
+        compiled_policy = CompiledPolicy([['admin', '*', 'project', 'view', 'project']])
+
+        assert compiled_policy.enforce('admin', 'core', 'project', 'view', 'project') is True
+        assert compiled_policy.enforce('admin', 'core', 'project', 'delete', 'project') is False
+
+    def test_enforce_does_not_combine_zones_and_actions_of_different_policies(self):
+        compiled_policy = CompiledPolicy(
+            [
+                ['admin', 'greenroom', 'file_any', 'view', 'project'],
+                ['admin', 'core', 'file_any', 'delete', 'project'],
+            ]
+        )
+
+        assert compiled_policy.enforce('admin', 'greenroom', 'file_any', 'delete', 'project') is False
+        assert compiled_policy.enforce('admin', '*', 'file_any', 'delete', 'project') is True
+
+    def test_is_compilable_returns_false_for_lines_not_matching_policy_definition(self):
+        assert CompiledPolicy.is_compilable([['admin', 'core', 'project', 'view']]) is False
+
+
+class TestGetUnconditionalSubjects:
+    def test_returns_platform_admin_for_model_matcher(self):
+        matcher = Config.new_config(MODEL_PATH).get('matchers::m')
+
+        assert get_unconditional_subjects(matcher) == {'platform_admin'}
+
+    @pytest.mark.parametrize(
+        'matcher,expected_subjects',
+        [
+            ("r.sub == 'admin'", {'admin'}),
+            ('((r.sub == "admin")) || r.sub == \'a || b\'', {'admin', 'a || b'}),
+            ("(r.sub == 'admin') && (r.obj == p.obj)", set()),
+            ("r.sub == p.sub || (r.sub == 'admin' && r.dom == '*')", set()),
+        ],
+    )
+    def test_returns_subjects_compared_to_literal_in_top_level_alternatives(self, matcher, expected_subjects):
+        assert get_unconditional_subjects(matcher) == expected_subjects
@@ -7,7 +7,9 @@
 import sqlalchemy
 from sqlalchemy.orm import Session
 
+from app.commons.policy_cache import policy_versions
 from app.models.permissions import CasbinRule
+from app.models.permissions import PolicyInheritanceModel
 
 
 class TestDefaultRoles:
@@ -29,9 +31,11 @@ class TestDefaultRoles:
         session.commit()
 
         payload = {'project_code': 'test_project'}
+        generation, version = policy_versions.get('test_project')
         response = test_client.post('/v1/defaultroles', json=payload)
 
         assert response.status_code == 200
+        assert policy_versions.get('test_project') == (generation, version + 1)
         rule = session.query(CasbinRule).filter(CasbinRule.v4 == 'test_project').first()
         assert rule.v0 == 'admin'
         assert rule.v1 == 'greenroom'
@@ -46,13 +50,13 @@ class TestDefaultRoles:
         session = Session(bind=engine)
         session.query(CasbinRule).delete()
         session.commit()
-        for _i in range(0, 3):
+        for operation in ('view', 'upload', 'delete'):
             fake_rule = {
                 'ptype': 'p',
                 'v0': 'admin',
                 'v1': 'greenroom',
                 'v2': 'project',
-                'v3': 'view',
+                'v3': operation,
                 'v4': 'pilotdefault',
             }
             new_rule = CasbinRule(**fake_rule)
@@ -74,7 +78,7 @@ class TestDefaultRoles:
         response = test_client.post('/v1/defaultroles', json=payload)
 
         assert response.status_code == 200
-        rule = session.query(CasbinRule).filter(CasbinRule.v4 == 'test_project')
+        rule = session.query(CasbinRule).filter(CasbinRule.v4 == 'test_project').order_by(CasbinRule.id)
         assert rule.count() == 3
         rule = rule.first()
         assert rule.v0 == 'admin'
@@ -84,3 +88,47 @@ class TestDefaultRoles:
         session.query(CasbinRule).delete()
         session.commit()
         session.close()
+
+    def test_default_roles_create_inheritance(self, test_client, db, mocker):
+        mocker.patch('app.config.ConfigSettings.CASBIN_DEFAULT_POLICY_INHERITANCE_ENABLED', True)
+        engine = sqlalchemy.create_engine(db.get_connection_url())
+        session = Session(bind=engine)
+        session.query(CasbinRule).delete()
+        session.add(CasbinRule(ptype='p', v0='admin', v1='greenroom', v2='project', v3='view', v4='pilotdefault'))
+        session.commit()
+
+        payload = {'project_code': 'test_project'}
+        generation, version = policy_versions.get('test_project')
+        response = test_client.post('/v1/defaultroles', json=payload)
+
+        assert response.status_code == 200
+        assert policy_versions.get('test_project') == (generation, version + 1)
+        assert session.query(CasbinRule).filter(CasbinRule.v4 == 'test_project').count() == 0
+        assert session.query(PolicyInheritanceModel).get('test_project') is not None
+        session.query(PolicyInheritanceModel).delete()
+        session.query(CasbinRule).delete()
+        session.commit()
+        session.close()
+
+    def test_default_roles_create_is_idempotent(self, test_client, db):
+        engine = sqlalchemy.create_engine(db.get_connection_url())
+        session = Session(bind=engine)
+        session.query(CasbinRule).delete()
+        for operation in ('view', 'upload'):
+            session.add(
+                CasbinRule(ptype='p', v0='admin', v1='greenroom', v2='project', v3=operation, v4='pilotdefault')
+            )
+        session.commit()
+
+        payload = {'project_code': 'test_project'}
+        first_response = test_client.post('/v1/defaultroles', json=payload)
+        second_response = test_client.post('/v1/defaultroles', json=payload)
+
+        assert first_response.status_code == 200
+        assert first_response.json()['total'] == 2
+        assert second_response.status_code == 200
+        assert second_response.json()['total'] == 0
+        assert session.query(CasbinRule).filter(CasbinRule.v4 == 'test_project').count() == 2
+        session.query(CasbinRule).delete()
+        session.commit()
+        session.close()
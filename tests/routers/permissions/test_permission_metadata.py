@@ -0,0 +1,154 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from sqlalchemy import delete
+
+from app.models.permissions import PermissionMetadataModel
+
+
+class TestPermissionMetadata:
+    async def test_get_returns_project_role_permissions_for_each_permission(
+        self, test_async_client, casbin_rule_factory, fake
+    ):
+        project_code = fake.project_code()
+        await casbin_rule_factory.create(
+            role='admin', zone='greenroom', resource='file_any', operation='view', project_code=project_code
+        )
+        await casbin_rule_factory.create(
+            role='collaborator', zone='core', resource='file_any', operation='view', project_code=project_code
+        )
+        params = {'project_code': project_code, 'page_size': 100}
+
+        response = await test_async_client.get('/v1/permissions/metadata', params=params)
+
+        assert response.status_code == 200
+        permissions = {
+            (permission['zone'], permission['resource'], permission['operation']): permission['permissions']
+            for permission in response.json()['result']
+        }
+        assert permissions['greenroom', 'file_any', 'view'] == {'admin': True, 'collaborator': False}
+        assert permissions['core', 'file_any', 'view'] == {'admin': False, 'collaborator': True}
+
+    async def test_get_responds_with_not_modified_for_matching_etag(self, test_async_client, fake):
+        params = {'project_code': fake.project_code()}
+        response = await test_async_client.get('/v1/permissions/metadata', params=params)
+        etag = response.headers['ETag']
+
+        response = await test_async_client.get(
+            '/v1/permissions/metadata', params=params, headers={'If-None-Match': etag}
+        )
+
+        assert response.status_code == 304
+
+    async def test_get_returns_new_etag_after_project_rules_change(self, test_async_client, casbin_rule_factory, fake):
+        from app.commons.policy_cache import invalidate_project_policies
+
+        project_code = fake.project_code()
+        params = {'project_code': project_code}
+        response = await test_async_client.get('/v1/permissions/metadata', params=params)
+        etag = response.headers['ETag']
+        await casbin_rule_factory.create(
+            zone='greenroom', resource='file_any', operation='view', project_code=project_code
+        )
+        invalidate_project_policies(project_code)
+
+        response = await test_async_client.get(
+            '/v1/permissions/metadata', params=params, headers={'If-None-Match': etag}
+        )
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    async def test_get_returns_permissions_page_sorted_by_order_by(self, test_async_client, fake):
+        params = {'project_code': fake.project_code(), 'order_by': 'name', 'order_type': 'desc', 'page_size': 5}
+
+        response = await test_async_client.get('/v1/permissions/metadata', params=params)
+
+        assert response.status_code == 200
+        body = response.json()
+        names = [permission['name'] for permission in body['result']]
+        assert len(names) == 5
+        assert names == sorted(names, reverse=True)
+        assert body['num_of_pages'] == -(-body['total'] // 5)
+
+    async def test_reload_returns_number_of_loaded_permissions(self, test_async_client):
+        response = await test_async_client.get('/v1/permissions/metadata', params={'project_code': 'any'})
+        total = response.json()['total']
+
+        response = await test_async_client.post('/v1/permissions/metadata/reload')
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body['total'] == total
+        assert body['result']['migration_version']
+        assert body['result']['revision']
+
+    async def test_get_returns_permission_added_without_migration_after_reload(
+        self, test_async_client, casbin_rule_factory, db_session, fake
+    ):
+        project_code = fake.project_code()
+        params = {'project_code': project_code, 'page_size': 1000}
+        await test_async_client.get('/v1/permissions/metadata', params=params)
+        permission = PermissionMetadataModel(
+            name=fake.word(), category='Project', resource=fake.pystr(), operation='view', zone='greenroom'
+        )
+        db_session.add(permission)
+        await db_session.commit()
+        await casbin_rule_factory.create(
+            role='admin', zone='greenroom', resource=permission.resource, operation='view', project_code=project_code
+        )
+
+        try:
+            await test_async_client.post('/v1/permissions/metadata/reload')
+            response = await test_async_client.get('/v1/permissions/metadata', params=params)
+        finally:
+            await db_session.execute(delete(PermissionMetadataModel).where(PermissionMetadataModel.id == permission.id))
+
+        assert response.status_code == 200
+        permissions = {permission['id']: permission['permissions'] for permission in response.json()['result']}
+        assert permissions[str(permission.id)]['admin'] is True
+
+
+class TestProjectPermissions:
+    async def test_put_applies_only_difference_to_roles_in_mapping(self, test_async_client, casbin_rule_factory, fake):
+        project_code = fake.project_code()
+        response = await test_async_client.get('/v1/permissions/metadata', params={'project_code': project_code})
+        permissions = response.json()['result'][:2]
+        for permission in permissions:
+            await casbin_rule_factory.create(
+                role='admin',
+                zone=permission['zone'],
+                resource=permission['resource'],
+                operation=permission['operation'],
+                project_code=project_code,
+            )
+        await casbin_rule_factory.create(
+            role='collaborator',
+            zone=permissions[0]['zone'],
+            resource=permissions[0]['resource'],
+            operation=permissions[0]['operation'],
+            project_code=project_code,
+        )
+        payload = {'project_code': project_code, 'rules': {'admin': [permissions[1]['id']], 'contributor': []}}
+
+        response = await test_async_client.put('/v1/permissions', json=payload)
+
+        assert response.status_code == 200
+        assert response.json()['result'] == {'created': 0, 'deleted': 1}
+        response = await test_async_client.get(
+            '/v1/permissions/metadata', params={'project_code': project_code, 'page_size': 100}
+        )
+        roles = {permission['id']: permission['permissions'] for permission in response.json()['result']}
+        assert roles[permissions[0]['id']]['admin'] is False
+        assert roles[permissions[0]['id']]['collaborator'] is True
+        assert roles[permissions[1]['id']]['admin'] is True
+
+    async def test_put_responds_with_not_found_for_unknown_permission_metadata(self, test_async_client, fake):
+        payload = {'project_code': fake.project_code(), 'rules': {'admin': [fake.uuid4()]}}
+
+        response = await test_async_client.put('/v1/permissions', json=payload)
+
+        assert response.status_code == 404
@@ -0,0 +1,83 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+
+class TestAuthorize:
+    async def test_get_returns_has_permission_true_for_allowed_request(self, test_async_client, casbin_rule_factory):
+        rule = await casbin_rule_factory.create()
+        params = {
+            'role': rule.v0,
+            'zone': rule.v1,
+            'resource': rule.v2,
+            'operation': rule.v3,
+            'project_code': rule.v4,
+        }
+
+        response = await test_async_client.get('/v1/authorize', params=params)
+
+        assert response.status_code == 200
+        assert response.json()['result'] == {'has_permission': True}
+
+    async def test_get_allows_platform_admin_without_loading_policies(self, test_async_client, fake, mocker):
+        from app.routers.permissions.casbin import Adapter
+
+        spy = mocker.spy(Adapter, 'get_compiled_policy_for_project')
+        params = {
+            'role': 'platform_admin',
+            'zone': 'core',
+            'resource': 'project',
+            'operation': 'delete',
+            'project_code': fake.project_code(),
+        }
+
+        response = await test_async_client.get('/v1/authorize', params=params)
+
+        assert response.status_code == 200
+        assert response.json()['result'] == {'has_permission': True}
+        assert spy.call_count == 0
+
+    async def test_post_batch_returns_decisions_in_request_order(self, test_async_client, casbin_rule_factory, fake):
+        rule = await casbin_rule_factory.create()
+        another_rule = await casbin_rule_factory.create(operation='delete')
+        allowed_check = {
+            'role': rule.v0,
+            'zone': rule.v1,
+            'resource': rule.v2,
+            'operation': rule.v3,
+            'project_code': rule.v4,
+        }
+        payload = {
+            'checks': [
+                allowed_check,
+                allowed_check | {'operation': 'delete'},
+                allowed_check | {'operation': 'delete', 'project_code': another_rule.v4},
+                allowed_check | {'project_code': fake.project_code()},
+                allowed_check | {'role': 'platform_admin', 'project_code': fake.project_code()},
+            ]
+        }
+
+        response = await test_async_client.post('/v1/authorize/batch', json=payload)
+
+        assert response.status_code == 200
+        assert response.json()['result'] == [
+            {'has_permission': True},
+            {'has_permission': False},
+            {'has_permission': True},
+            {'has_permission': False},
+            {'has_permission': True},
+        ]
+
+    async def test_post_batch_loads_policies_once_per_project(self, test_async_client, casbin_rule_factory, mocker):
+        from app.routers.permissions.casbin import Adapter
+
+        rule = await casbin_rule_factory.create()
+        check = {'role': rule.v0, 'zone': rule.v1, 'resource': rule.v2, 'operation': rule.v3, 'project_code': rule.v4}
+        spy = mocker.spy(Adapter, 'get_compiled_policy_for_project')
+
+        response = await test_async_client.post('/v1/authorize/batch', json={'checks': [check] * 10})
+
+        assert response.status_code == 200
+        assert spy.call_count == 1
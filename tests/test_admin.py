@@ -247,3 +247,108 @@ def test_list_user_stats_under_roles_with_invalid_project(test_client, mocker, k
     )
     assert response.status_code == 500
     assert response.json().get('error_msg') == 'Role invalid_project-admin is not found'
+
+
+@pytest.mark.parametrize('set_identity_backend', ['keycloak'], indirect=True)
+def test_project_onboarding_runs_all_steps(
+    test_client, keycloak_create_role_mock, identity_client_mock, set_identity_backend, fake
+):
+    project_code = fake.project_code()
+
+    response = test_client.post('/v1/admin/projects/onboarding', json={'project_code': project_code})
+
+    assert response.status_code == 200
+    result = response.json()['result']
+    assert {step: step_result['status'] for step, step_result in result.items()} == {
+        'realm_roles': 'completed',
+        'database': 'completed',
+        'directory_group': 'completed',
+    }
+    assert sorted(result['realm_roles']['details']['created']) == [
+        f'{project_code}-admin',
+        f'{project_code}-collaborator',
+        f'{project_code}-contributor',
+    ]
+    assert result['database']['details']['roles'] == 3
+    assert all(step_result['duration_ms'] >= 0 for step_result in result.values())
+
+
+@pytest.mark.parametrize('set_identity_backend', ['keycloak'], indirect=True)
+def test_project_onboarding_reports_failed_steps(
+    test_client, mocker, keycloak_create_role_mock, set_identity_backend, fake
+):
+    mocker.patch(
+        'app.services.data_providers.keycloak_client.KeycloakClient.__init__', side_effect=Exception('Unavailable')
+    )
+
+    response = test_client.post('/v1/admin/projects/onboarding', json={'project_code': fake.project_code()})
+
+    assert response.status_code == 500
+    assert response.json()['error_msg'] == 'Failed project onboarding steps: directory_group'
+    result = response.json()['result']
+    assert result['directory_group']['error'] == 'Unavailable'
+    assert result['realm_roles']['status'] == 'completed'
+    assert result['database']['status'] == 'completed'
+
+
+@pytest.mark.parametrize('project_role', ['', 'new-role', 'new role'])
+def test_project_onboarding_rejects_invalid_role_names(test_client, fake, project_role):
+    payload = {'project_code': fake.project_code(), 'project_roles': ['admin', project_role]}
+
+    response = test_client.post('/v1/admin/projects/onboarding', json=payload)
+
+    assert response.status_code == 400
+
+
+def test_project_onboarding_writes_audit_log(test_client, mocker, fake):
+    audit = mocker.patch('app.logger.logger.audit')
+    project_code = fake.project_code()
+
+    response = test_client.post(
+        '/v1/admin/projects/onboarding', json={'project_code': project_code, 'steps': ['database']}
+    )
+
+    assert response.status_code == 200
+    assert audit.call_args_list[-1] == mocker.call(
+        'Successfully managed to onboard project.',
+        project_code=project_code,
+        project_roles=['admin', 'contributor', 'collaborator'],
+        steps=['database'],
+    )
+
+
+def test_project_onboarding_can_be_resumed_for_selected_steps(test_client, fake):
+    payload = {'project_code': fake.project_code(), 'steps': ['database']}
+
+    first_response = test_client.post('/v1/admin/projects/onboarding', json=payload)
+    second_response = test_client.post('/v1/admin/projects/onboarding', json=payload)
+
+    assert first_response.status_code == 200
+    assert list(first_response.json()['result']) == ['database']
+    assert first_response.json()['result']['database']['details']['roles'] == 3
+    assert second_response.json()['result']['database']['details']['roles'] == 0
+
+
+def test_clone_role_copies_source_role_permissions(test_client, keycloak_create_role_mock, db_for_common_tests, fake):
+    from app.commons.psql_services.permissions import create_casbin_rule
+    from app.commons.psql_services.permissions import create_role_record
+
+    project_code = fake.project_code()
+    create_role_record('contributor', project_code, True)
+    create_casbin_rule('contributor', 'project', 'view', 'greenroom', project_code)
+    create_casbin_rule('contributor', 'file_any', 'upload', 'greenroom', project_code)
+    payload = {'project_code': project_code, 'source_role': 'contributor', 'new_role': 'reviewer'}
+
+    response = test_client.post('/v1/admin/roles/clone', json=payload)
+
+    assert response.status_code == 200
+    assert response.json()['total'] == 2
+
+
+@pytest.mark.parametrize('new_role', ['', 'new-role', 'new role'])
+def test_clone_role_rejects_invalid_role_name(test_client, fake, new_role):
+    payload = {'project_code': fake.project_code(), 'source_role': 'contributor', 'new_role': new_role}
+
+    response = test_client.post('/v1/admin/roles/clone', json=payload)
+
+    assert response.status_code == 400